@@ -4,9 +4,17 @@ import subprocess
 import os
 import sys
 import shutil
+import bisect
+import threading
+from importlib.metadata import version, PackageNotFoundError
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import numpy as np
 from send2trash import send2trash
-from scenedetect import VideoManager, SceneManager
-from scenedetect.detectors import ContentDetector
+from scenedetect import open_video, SceneManager, ContentDetector
+
+# Threads given to each segment encode; the number of encodes run at once is derived from it
+# so that all file workers together keep roughly one encoder thread per CPU
+SEGMENT_ENCODE_THREADS = 2
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
@@ -32,57 +40,110 @@ def parse_arguments():
         default=0.0,
         help="Padding in seconds around each transition (default: 0.0)."
     )
+    parser.add_argument(
+        "--downscale",
+        type=int,
+        default=0,
+        help=(
+            "Integer factor to downscale frames by before scene detection (default: 0 = auto, "
+            "which picks one factor per 480 pixels of width)."
+        )
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help=(
+            "Stream-copy segments instead of re-encoding them. Cut points are snapped back to the "
+            "nearest preceding keyframe, so segments may start slightly earlier than the detected scene."
+        )
+    )
+    parser.add_argument(
+        "--preset",
+        default="veryfast",
+        choices=["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow"],
+        help="libx264 encoding preset used when re-encoding segments (default: veryfast)."
+    )
     return parser.parse_args()
 
-def detect_scenes(input_file, threshold):
+def detect_scenes(input_file, threshold, downscale=0):
     """
     Detect scene boundaries using PySceneDetect.
 
     :param input_file: Path to the input video file.
     :param threshold: Scene detection threshold.
-    :return: List of tuples representing (start_time, end_time) for each scene in seconds.
+    :param downscale: Downscale factor for detection; 0 picks one based on the video width.
+    :return: Tuple of (scene_times, duration), where scene_times is a list of (start_time, end_time)
+             tuples for each scene and duration is the total video duration, all in seconds.
     """
-    video_manager = VideoManager([input_file])
+    video = open_video(input_file, backend='pyav')
     scene_manager = SceneManager()
-    detector = ContentDetector(threshold=threshold)
-    detector.min_scene_len = 2  # Set the minimum scene length directly on the detector
-    scene_manager.add_detector(detector)
+    scene_manager.add_detector(ContentDetector(threshold=threshold, min_scene_len=2))
 
-    # Optional: Set downscale factor for faster processing
-    video_manager.set_downscale_factor()
+    # Downscale frames for faster processing
+    if downscale <= 0:
+        downscale = get_auto_downscale(video.frame_size[0])
+    scene_manager.auto_downscale = False
+    scene_manager.downscale = downscale
 
-    try:
-        video_manager.start()
-        scene_manager.detect_scenes(frame_source=video_manager)
-        scene_list = scene_manager.get_scene_list()
-        # Convert scene list to list of (start, end) times in seconds
-        scene_times = [(scene[0].get_seconds(), scene[1].get_seconds()) for scene in scene_list]
-        return scene_times
-    finally:
-        video_manager.release()
+    scene_manager.detect_scenes(video=video, show_progress=False)
+    scene_list = scene_manager.get_scene_list()
+    # Convert scene list to list of (start, end) times in seconds
+    scene_times = [(scene[0].get_seconds(), scene[1].get_seconds()) for scene in scene_list]
+    return scene_times, video.duration.get_seconds()
+
+def get_auto_downscale(width):
+    """
+    Pick a scene detection downscale factor from the video width (one factor per 480 pixels).
+
+    :param width: Width of the video in pixels.
+    :return: Downscale factor of at least 1.
+    """
+    return max(1, width // 480)
 
-def get_video_duration(input_file):
+def list_keyframes(input_file):
     """
-    Retrieve the total duration of the video in seconds using ffprobe.
+    Retrieve the timestamps of all keyframes in the first video stream using ffprobe.
 
     :param input_file: Path to the input video file.
-    :return: Duration in seconds.
+    :return: Sorted list of keyframe timestamps in seconds.
     """
     cmd = [
         "ffprobe", "-v", "error",
-        "-show_entries", "format=duration",
-        "-of", "default=noprint_wrappers=1:nokey=1",
+        "-select_streams", "v:0",
+        "-skip_frame", "nokey",
+        "-show_frames",
+        "-show_entries", "frame=pts_time",
+        "-of", "csv=print_section=0",
         input_file
     ]
     try:
         result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, check=True)
-        return float(result.stdout.strip())
     except subprocess.CalledProcessError as e:
-        print(f"Error retrieving video duration for '{input_file}': {e.stderr}", file=sys.stderr)
-        sys.exit(1)
-    except ValueError:
-        print(f"Error: Unable to parse video duration for '{input_file}'.", file=sys.stderr)
-        sys.exit(1)
+        print(f"Error retrieving keyframes for '{input_file}': {e.stderr}", file=sys.stderr)
+        return []
+
+    keyframes = []
+    for line in result.stdout.splitlines():
+        value = line.strip().rstrip(',')
+        try:
+            keyframes.append(float(value))
+        except ValueError:
+            continue
+    keyframes.sort()
+    return keyframes
+
+def snap_to_keyframe(time, keyframes):
+    """
+    Snap a timestamp back to the largest keyframe that is not after it.
+
+    :param time: Timestamp in seconds.
+    :param keyframes: Sorted list of keyframe timestamps in seconds.
+    :return: The snapped timestamp, or the original time if no keyframe precedes it.
+    """
+    idx = bisect.bisect_right(keyframes, time)
+    if idx == 0:
+        return time
+    return keyframes[idx - 1]
 
 def get_scene_boundaries(scenes, video_duration):
     """
@@ -109,67 +170,107 @@ def apply_padding(scene_boundaries, padding, video_duration):
     :param video_duration: Total duration of the video in seconds.
     :return: List of tuples (start, end) for each segment with padding.
     """
+    if not scene_boundaries:
+        return []
+
     half_padding = padding / 2
-    segments = []
-    previous_segment_end = 0.0
-
-    for idx, (scene_start, scene_end) in enumerate(scene_boundaries):
-        # Calculate padded start and end
-        padded_start = scene_start - half_padding
-        padded_end = scene_end + half_padding
-
-        # Clamp the padded times to the video duration boundaries
-        padded_start = max(padded_start, 0.0)
-        padded_end = min(padded_end, video_duration)
-
-        # Ensure no overlap with the previous segment
-        if padded_start < previous_segment_end:
-            padded_start = previous_segment_end
-
-        # Ensure that the segment has a positive duration
-        if padded_end > padded_start:
-            segments.append((padded_start, padded_end))
-            previous_segment_end = padded_end
-        else:
-            print(f"Warning: Segment {idx + 1} has non-positive duration and will be skipped.", file=sys.stderr)
+    bounds = np.asarray(scene_boundaries, dtype=np.float64)
 
-    return segments
+    # Calculate padded start and end, clamped to the video duration boundaries
+    starts = np.clip(bounds[:, 0] - half_padding, 0.0, video_duration)
+    ends = np.clip(bounds[:, 1] + half_padding, 0.0, video_duration)
 
-def split_video(input_file, segments, output_dir):
+    # Ensure no overlap with the previous segment
+    previous_ends = np.maximum.accumulate(np.concatenate(([0.0], ends[:-1])))
+    starts = np.maximum(starts, previous_ends)
+
+    # Ensure that the segment has a positive duration
+    keep = ends > starts
+    for idx in np.flatnonzero(~keep):
+        print(f"Warning: Segment {idx + 1} has non-positive duration and will be skipped.", file=sys.stderr)
+
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+def split_video(input_file, segments, output_dir, fast=False, preset="veryfast", segment_workers=1):
     """
     Split the video into segments using ffmpeg with re-encoding for frame-accurate cuts.
 
+    Segments are encoded concurrently, with at most segment_workers ffmpeg processes running at once.
+    In fast mode the streams are copied instead, with each start snapped back to a keyframe.
+
     :param input_file: Path to the input video file.
     :param segments: List of tuples representing (start, end) times for each segment.
     :param output_dir: Directory where the segments will be saved.
+    :param fast: If True, stream-copy keyframe-aligned segments instead of re-encoding.
+    :param preset: libx264 preset used when re-encoding.
+    :param segment_workers: Maximum number of ffmpeg processes to run at once.
     """
     base_name, ext = os.path.splitext(os.path.basename(input_file))
     os.makedirs(output_dir, exist_ok=True)
 
+    keyframes = list_keyframes(input_file) if fast else []
+    running = []
+
     for idx, (start, end) in enumerate(segments, start=1):
+        if fast:
+            start = snap_to_keyframe(start, keyframes)
         duration = end - start
         output_file = os.path.join(output_dir, f"{base_name}_segment_{idx:03d}{ext}")
 
-        # FFmpeg command for re-encoding to ensure frame-accurate cuts
-        ffmpeg_cmd = [
-            "ffmpeg", "-hide_banner", "-loglevel", "error",
-            "-i", input_file,
-            "-ss", f"{start}",
-            "-t", f"{duration}",
-            "-c:v", "libx264",        # Video codec
-            "-preset", "fast",        # Encoding speed/quality
-            "-crf", "18",             # Quality (lower is better)
-            "-c:a", "aac",            # Audio codec
-            "-b:a", "192k",           # Audio bitrate
-            "-avoid_negative_ts", "make_zero",
-            output_file
-        ]
+        if fast:
+            # Seek before the input and copy the streams; no decode or encode is needed
+            ffmpeg_cmd = [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-ss", f"{start}",
+                "-i", input_file,
+                "-t", f"{duration}",
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+                output_file
+            ]
+        else:
+            # FFmpeg command for re-encoding to ensure frame-accurate cuts
+            ffmpeg_cmd = [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-i", input_file,
+                "-ss", f"{start}",
+                "-t", f"{duration}",
+                "-c:v", "libx264",        # Video codec
+                "-preset", preset,        # Encoding speed/quality
+                "-crf", "18",             # Quality (lower is better)
+                "-threads", str(SEGMENT_ENCODE_THREADS),  # Keep concurrent encodes from oversubscribing the CPU
+                "-c:a", "aac",            # Audio codec
+                "-b:a", "192k",           # Audio bitrate
+                "-avoid_negative_ts", "make_zero",
+                output_file
+            ]
+
+        # Wait for a slot in the pool before launching the next encode
+        if len(running) >= segment_workers:
+            wait_for_segment(*running.pop(0))
 
         print(f"Creating segment {idx}: start={start:.3f}s, duration={duration:.3f}s -> {output_file}")
         try:
-            subprocess.run(ffmpeg_cmd, check=True)
-        except subprocess.CalledProcessError as e:
+            process = subprocess.Popen(ffmpeg_cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        except OSError as e:
             print(f"Error creating segment {idx}: {e}", file=sys.stderr)
+            continue
+        running.append((idx, process))
+
+    # Drain the remaining encodes
+    for idx, process in running:
+        wait_for_segment(idx, process)
+
+def wait_for_segment(idx, process):
+    """
+    Wait for a segment's ffmpeg process to finish and report a failure if it had one.
+
+    :param idx: Segment number, used in error messages.
+    :param process: The running ffmpeg subprocess.Popen object.
+    """
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        print(f"Error creating segment {idx}: ffmpeg exited with status {process.returncode}: {stderr.strip()}", file=sys.stderr)
 
 def move_original(input_file, transitions_dir):
     """
@@ -185,24 +286,68 @@ def move_original(input_file, transitions_dir):
     except Exception as e:
         print(f"Warning: Could not move the original file '{input_file}': {e}", file=sys.stderr)
 
-def move_screen_jpg(input_file):
+def find_screen_jpg(input_file):
     """
-    Check for a corresponding '-screen.jpg' file and move it to the Trash if it exists.
+    Check for a corresponding '-screen.jpg' file.
 
     :param input_file: Path to the input video file.
+    :return: Path to the '-screen.jpg' file, or None if it does not exist.
     """
     base_name, _ = os.path.splitext(os.path.basename(input_file))
     dir_name = os.path.dirname(os.path.abspath(input_file))
     screen_jpg = os.path.join(dir_name, f"{base_name}-screen.jpg")
 
     if os.path.isfile(screen_jpg):
+        return screen_jpg
+    return None
+
+def send2trash_accepts_lists():
+    """
+    Check whether the installed send2trash takes a list of paths (added in Send2Trash 1.8).
+
+    :return: True if send2trash can be called with a list of paths.
+    """
+    try:
+        major, minor = (int(part) for part in version("Send2Trash").split(".")[:2])
+    except (PackageNotFoundError, ValueError):
+        return False
+    return (major, minor) >= (1, 8)
+
+def trash_files(paths):
+    """
+    Move files to the Trash in a single batched send2trash call.
+
+    Falls back to trashing the files one by one on a thread pool if send2trash does not accept a list,
+    or if the batched call fails.
+
+    :param paths: List of file paths to move to the Trash.
+    """
+    if not paths:
+        return
+    if send2trash_accepts_lists():
+        try:
+            send2trash(paths)
+            for path in paths:
+                print(f"Moved '{path}' to Trash.")
+            return
+        except Exception as e:
+            print(f"Warning: Batch move to Trash failed ({e}); retrying one file at a time.", file=sys.stderr)
+
+    def trash_one(path):
+        if not os.path.lexists(path):
+            # A failed batch already moved this one before it stopped
+            print(f"Moved '{path}' to Trash.")
+            return
         try:
-            send2trash(screen_jpg)
-            print(f"Moved '{screen_jpg}' to Trash.")
+            send2trash(path)
+            print(f"Moved '{path}' to Trash.")
         except Exception as e:
-            print(f"Warning: Could not move '{screen_jpg}' to Trash: {e}", file=sys.stderr)
+            print(f"Warning: Could not move '{path}' to Trash: {e}", file=sys.stderr)
 
-def process_file(input_file, threshold, padding):
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(trash_one, paths))
+
+def process_file(input_file, threshold, padding, fast=False, preset="veryfast", downscale=0, segment_workers=1):
     """
     Process a single input file: detect scenes, apply padding, split video, and handle auxiliary files.
 
@@ -211,18 +356,21 @@ def process_file(input_file, threshold, padding):
     :param input_file: Path to the input video file.
     :param threshold: Scene detection threshold.
     :param padding: Padding in seconds around each transition.
+    :param fast: If True, stream-copy keyframe-aligned segments instead of re-encoding.
+    :param preset: libx264 preset used when re-encoding.
+    :param downscale: Downscale factor for scene detection; 0 picks one automatically.
+    :param segment_workers: Maximum number of segment encodes to run at once for this file.
+    :return: Path to the corresponding '-screen.jpg' file to move to the Trash, or None.
     """
     print(f"\nProcessing '{input_file}'...")
 
     # Detect scenes
-    scenes = detect_scenes(input_file, threshold)
+    scenes, video_duration = detect_scenes(input_file, threshold, downscale)
     if not scenes:
         print(f"No transition points were found in '{input_file}'. Doing nothing.")
-        return
+        return None
     print(f"Detected {len(scenes)} scene change(s).")
 
-    # Get video duration
-    video_duration = get_video_duration(input_file)
     print(f"Video duration: {video_duration:.3f} seconds.")
 
     # Define scene boundaries (each scene is a tuple of (start_time, end_time))
@@ -242,15 +390,30 @@ def process_file(input_file, threshold, padding):
 
     # Split video
     if segments:
-        split_video(input_file, segments, output_dir)
+        split_video(input_file, segments, output_dir, fast=fast, preset=preset, segment_workers=segment_workers)
     else:
         print(f"No valid segments to create for '{input_file}'.", file=sys.stderr)
 
     # Move the original file into the transitions directory
     move_original(input_file, transitions_dir)
 
-    # Move corresponding '-screen.jpg' to Trash if it exists
-    move_screen_jpg(input_file)
+    # The corresponding '-screen.jpg' is moved to the Trash in batches by the main process
+    return find_screen_jpg(input_file)
+
+def _process_file_star(task):
+    """
+    Unpack a tuple of process_file arguments and run process_file in a worker process.
+
+    Stdout is flushed when the task finishes so output from parallel workers is not held back.
+
+    :param task: Tuple of arguments for process_file.
+    :return: The result of process_file.
+    """
+    try:
+        return process_file(*task)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
 
 def main():
     args = parse_arguments()
@@ -258,18 +421,53 @@ def main():
     input_files = args.input_files
     threshold = args.g
     padding = args.p
+    fast = args.fast
+    preset = args.preset
+    downscale = args.downscale
 
     # Validate threshold
     if threshold < 0.0 or threshold > 100.0:
         print(f"Error: Invalid threshold '{threshold}'. Must be between 0.0 and 100.0.", file=sys.stderr)
         sys.exit(1)
 
-    # Process each input file
+    # Collect the files that exist
+    valid_files = []
     for input_file in input_files:
         if not os.path.isfile(input_file):
             print(f"Error: File '{input_file}' not found. Skipping.", file=sys.stderr)
             continue
-        process_file(input_file, threshold, padding)
+        valid_files.append(input_file)
+
+    # Process each input file in its own worker process. The '-screen.jpg' files are moved to the
+    # Trash on a background thread as files finish; every file that arrives while the previous
+    # send2trash call is running goes into the next call as one batch.
+    pending_trash = []
+    pending_lock = threading.Lock()
+
+    def trash_pending():
+        with pending_lock:
+            batch = pending_trash[:]
+            pending_trash.clear()
+        trash_files(batch)
+
+    if valid_files:
+        cpu_count = os.cpu_count() or 1
+        max_workers = min(len(valid_files), cpu_count)
+        # Share the CPUs between the file workers so their segment encodes do not oversubscribe them
+        segment_workers = max(1, cpu_count // (SEGMENT_ENCODE_THREADS * max_workers))
+        tasks = [(input_file, threshold, padding, fast, preset, downscale, segment_workers) for input_file in valid_files]
+        with ThreadPoolExecutor(max_workers=1) as trasher, ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(_process_file_star, task): task[0] for task in tasks}
+            for future in as_completed(futures):
+                try:
+                    screen_jpg = future.result()
+                except Exception as e:
+                    print(f"Error processing '{futures[future]}': {e}", file=sys.stderr)
+                    continue
+                if screen_jpg:
+                    with pending_lock:
+                        pending_trash.append(screen_jpg)
+                    trasher.submit(trash_pending)
 
     print("\nAll done!")
 
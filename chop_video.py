@@ -3,6 +3,10 @@
 import subprocess
 import argparse
 import os
+import re
+
+# Matches [mm:]ss[.fraction], e.g. "10.46", "01:10.46" or "5:15"
+TIME_STRING_PATTERN = re.compile(r'^(?:(\d+):)?(\d+)(?:\.(\d+))?$')
 
 
 def parse_time_string(time_str):
@@ -12,31 +16,16 @@ def parse_time_string(time_str):
       - "01:10.46"   ->  1:10.46   (1 minute, 10.46 seconds)
       - "5:15"       ->  5:15.00   (5 minutes, 15 seconds)
     """
-    try:
-        parts = time_str.split(':')
-        if len(parts) == 1:
-            # No colon -> entire string is seconds(.fraction)
-            minutes = 0
-            seconds_fraction = parts[0]
-        elif len(parts) == 2:
-            # One colon -> mm:ss(.fraction)
-            minutes_str, seconds_fraction = parts
-            minutes = int(minutes_str)
-        else:
-            raise ValueError("Invalid time format: too many colons.")
-
-        if '.' in seconds_fraction:
-            seconds_str, fraction_str = seconds_fraction.split('.')
-            seconds = int(seconds_str)
-            fraction = int(fraction_str) / (10 ** len(fraction_str))
-        else:
-            seconds = int(seconds_fraction)
-            fraction = 0
+    match = TIME_STRING_PATTERN.match(time_str)
+    if not match:
+        raise ValueError(f"Error parsing time string '{time_str}': expected [mm:]ss[.fraction]")
 
-        return minutes * 60 + seconds + fraction
+    minutes_str, seconds_str, fraction_str = match.groups()
+    minutes = int(minutes_str) if minutes_str else 0
+    seconds = int(seconds_str)
+    fraction = int(fraction_str) / (10 ** len(fraction_str)) if fraction_str else 0
 
-    except Exception as e:
-        raise ValueError(f"Error parsing time string '{time_str}': {e}")
+    return minutes * 60 + seconds + fraction
 
 
 def get_video_duration(input_file):
@@ -125,8 +114,8 @@ def split_video(input_file, timestamps, padding):
 
         ffmpeg_command = [
             'ffmpeg',
+            '-ss', str(segment_start),  # Input seek: jump to the nearest keyframe instead of decoding from the start
             '-i', input_file,
-            '-ss', str(segment_start),
             '-t', str(segment_duration),
             '-c:v', 'libx264',
             '-an',       # Currently discards audio; remove or modify if you need audio
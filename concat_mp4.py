@@ -7,13 +7,18 @@ import tempfile
 import random
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Cache of ffprobe results, keyed by file path, modification time and size
+PROBE_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'concat_mp4', 'probe.json')
+
+# Bumped whenever get_video_properties returns different fields, so older cache files are ignored
+PROBE_CACHE_VERSION = 2
 
 def check_ffmpeg():
     """Check if ffmpeg and ffprobe are installed."""
     for cmd in ['ffmpeg', 'ffprobe']:
-        try:
-            subprocess.run([cmd, '-version'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except FileNotFoundError:
+        if shutil.which(cmd) is None:
             print(f"Error: {cmd} is not installed or not found in PATH.")
             sys.exit(1)
 
@@ -35,57 +40,202 @@ def archive_files(file_list):
         except Exception as e:
             print(f"Error archiving {file_path}: {e}")
 
-def get_video_resolution(file_path):
-    """Retrieve the resolution of a video using ffprobe."""
+def get_video_properties(file_path):
+    """
+    Retrieve the stream properties of a video that must match for a stream-copy concat.
+
+    Returns a tuple of (width, height, codec_name, pix_fmt, r_frame_rate, time_base,
+    audio_sample_rate, audio_channels, audio_codec), where the audio fields are None if the file
+    has no audio stream. audio_codec stays last, so a None there marks a file without audio.
+    """
     cmd = [
-        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
-        '-show_entries', 'stream=width,height', '-of', 'json',
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'stream=codec_type,codec_name,width,height,pix_fmt,r_frame_rate,time_base,sample_rate,channels',
+        '-of', 'json',
         file_path
     ]
     try:
         result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
-        data = json.loads(result.stdout)
-        width = data['streams'][0]['width']
-        height = data['streams'][0]['height']
-        return width, height
-    except (subprocess.CalledProcessError, KeyError, IndexError, json.JSONDecodeError) as e:
+        streams = json.loads(result.stdout)['streams']
+        video = next(stream for stream in streams if stream.get('codec_type') == 'video')
+        audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+        return (
+            video['width'],
+            video['height'],
+            video.get('codec_name'),
+            video.get('pix_fmt'),
+            video.get('r_frame_rate'),
+            video.get('time_base'),
+            audio.get('sample_rate') if audio else None,
+            audio.get('channels') if audio else None,
+            audio.get('codec_name') if audio else None,
+        )
+    except (subprocess.CalledProcessError, KeyError, StopIteration, json.JSONDecodeError) as e:
         print(f"Error retrieving resolution for {file_path}: {e}")
         sys.exit(1)
 
-def determine_common_resolution(file_list):
+def load_probe_cache():
+    """Load the on-disk cache of ffprobe results, or return an empty cache if there is none."""
+    try:
+        with open(PROBE_CACHE_PATH, 'r') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get('version') != PROBE_CACHE_VERSION:
+        return {}
+    return data.get('entries', {})
+
+def save_probe_cache(cache):
+    """Atomically write the cache of ffprobe results back to disk."""
+    try:
+        cache_dir = os.path.dirname(PROBE_CACHE_PATH)
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=cache_dir, delete=False) as temp_file:
+            json.dump({'version': PROBE_CACHE_VERSION, 'entries': cache}, temp_file)
+        os.replace(temp_file.name, PROBE_CACHE_PATH)
+    except OSError as e:
+        print(f"Warning: Could not write probe cache {PROBE_CACHE_PATH}: {e}")
+
+def get_cached_video_properties(file_path, cache):
+    """Return the video properties from the cache if the file is unchanged, probing it otherwise."""
+    st = os.stat(file_path)
+    key = f"{os.path.abspath(file_path)}:{st.st_mtime_ns}:{st.st_size}"
+    if key not in cache:
+        cache[key] = list(get_video_properties(file_path))
+    return tuple(cache[key])
+
+def probe_videos(file_list):
+    """
+    Retrieve the stream properties of every input video.
+
+    Results are cached on disk by path, modification time and size; cache misses are probed concurrently.
+    """
+    cache = load_probe_cache()
+    cache_size = len(cache)
+    with ThreadPoolExecutor(max_workers=min(32, len(file_list))) as executor:
+        video_properties = list(executor.map(lambda file: get_cached_video_properties(file, cache), file_list))
+    if len(cache) != cache_size:
+        save_probe_cache(cache)
+    return video_properties
+
+def determine_common_resolution(video_properties):
     """Determine the maximum width and height among all input videos."""
     max_width = 0
     max_height = 0
-    for file in file_list:
-        width, height = get_video_resolution(file)
+    for width, height, *_ in video_properties:
         if width > max_width:
             max_width = width
         if height > max_height:
             max_height = height
     return max_width, max_height
 
-def reencode_videos(file_list, target_width, target_height, temp_dir):
-    """Re-encode all videos to the target resolution and store them in temp_dir."""
-    reencoded_files = []
+def get_video_duration(file_path):
+    """Retrieve the duration of a video in seconds using ffprobe."""
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=duration',
+        '-of', 'default=noprint_wrappers=1:nokey=1',
+        file_path
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True, text=True)
+        return float(result.stdout.strip())
+    except (subprocess.CalledProcessError, ValueError) as e:
+        print(f"Error retrieving duration for {file_path}: {e}")
+        sys.exit(1)
+
+def build_reencode_command(file_list, video_properties, target_width, target_height, output_filename):
+    """
+    Build a single ffmpeg command that scales, pads and concatenates all videos in one filter graph.
+
+    Inputs without an audio track get a silent track of the same length if any other input has audio.
+    """
+    cmd = ['ffmpeg']
+    for file in file_list:
+        cmd += ['-i', file]
+
+    has_audio = [props[-1] is not None for props in video_properties]
+    with_audio = any(has_audio)
+
+    filters = []
+    segments = []
+    silent_inputs = 0
     for idx, file in enumerate(file_list):
-        output_path = os.path.join(temp_dir, f"reencoded_{idx}.mp4")
-        cmd = [
-            'ffmpeg', '-i', file,
-            '-vf', f"scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2",
-            '-c:v', 'libx264', '-crf', '23', '-preset', 'medium',
-            '-c:a', 'aac', '-b:a', '192k',
-            '-y',  # Overwrite without asking
-            output_path
-        ]
-        print(f"Re-encoding {file} to resolution {target_width}x{target_height}...")
-        try:
-            subprocess.run(cmd, check=True)
-            reencoded_files.append(output_path)
-            print(f"Re-encoded {file} successfully.")
-        except subprocess.CalledProcessError as e:
-            print(f"Error re-encoding {file}: {e}")
-            sys.exit(1)
-    return reencoded_files
+        filters.append(
+            f"[{idx}:v]scale={target_width}:{target_height}:force_original_aspect_ratio=decrease,"
+            f"pad={target_width}:{target_height}:(ow-iw)/2:(oh-ih)/2,setsar=1[v{idx}]"
+        )
+        segments.append(f"[v{idx}]")
+        if not with_audio:
+            continue
+        if has_audio[idx]:
+            audio_input = f"{idx}:a"
+        else:
+            # Generate silence for inputs that have no audio track
+            cmd += ['-f', 'lavfi', '-t', f"{get_video_duration(file)}",
+                    '-i', 'anullsrc=channel_layout=stereo:sample_rate=48000']
+            audio_input = f"{len(file_list) + silent_inputs}:a"
+            silent_inputs += 1
+        filters.append(f"[{audio_input}]aresample=48000,aformat=channel_layouts=stereo[a{idx}]")
+        segments.append(f"[a{idx}]")
+
+    if with_audio:
+        filters.append(f"{''.join(segments)}concat=n={len(file_list)}:v=1:a=1[v][a]")
+    else:
+        filters.append(f"{''.join(segments)}concat=n={len(file_list)}:v=1:a=0[v]")
+
+    cmd += ['-filter_complex', ';'.join(filters), '-map', '[v]']
+    if with_audio:
+        cmd += ['-map', '[a]', '-c:a', 'aac', '-b:a', '192k']
+    cmd += [
+        '-c:v', 'libx264', '-crf', '23',  # CRF stays at 23; the faster preset only trades off file size
+        '-preset', 'veryfast',
+        '-movflags', '+faststart',
+        output_filename
+    ]
+    return cmd
+
+def concat_reencode(file_list, video_properties, output_filename):
+    """Concatenate videos of differing formats, encoding the joined output once at the largest resolution."""
+    # Determine common resolution
+    target_width, target_height = determine_common_resolution(video_properties)
+    print(f"Common resolution set to {target_width}x{target_height}.")
+
+    cmd = build_reencode_command(file_list, video_properties, target_width, target_height, output_filename)
+    try:
+        print(f"Re-encoding and concatenating videos into {output_filename}...")
+        subprocess.run(cmd, check=True)
+        print(f"Successfully created {output_filename}")
+    except subprocess.CalledProcessError as e:
+        print(f"Error during ffmpeg execution: {e}")
+        sys.exit(1)
+
+def concat_copy(file_list, output_filename):
+    """Concatenate videos that share the same format using the concat demuxer and stream copy."""
+    # Create a temporary file to hold the list of files to concatenate
+    with tempfile.NamedTemporaryFile('w', delete=False) as temp_file:
+        for filename in file_list:
+            # Escape single quotes in filenames
+            escaped_filename = os.path.abspath(filename).replace("'", "'\\''")
+            temp_file.write(f"file '{escaped_filename}'\n")
+        temp_filename = temp_file.name
+
+    # Construct and run the ffmpeg concat command
+    cmd = [
+        'ffmpeg', '-f', 'concat', '-safe', '0',
+        '-i', temp_filename, '-c', 'copy', output_filename
+    ]
+    try:
+        print(f"Concatenating videos into {output_filename}...")
+        subprocess.run(cmd, check=True)
+        print(f"Successfully created {output_filename}")
+    except subprocess.CalledProcessError as e:
+        print(f"Error during ffmpeg execution: {e}")
+        sys.exit(1)
+    finally:
+        # Clean up the temporary concat list file
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
 
 def main():
     parser = argparse.ArgumentParser(description='Concatenate multiple MP4 files into one, handling different dimensions.')
@@ -124,43 +274,19 @@ def main():
     output_root = new_root + '_joined_' + random_str
     output_filename = os.path.join(dirname, output_root + ext)
 
-    # Create a temporary directory to store re-encoded videos
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Determine common resolution
-        print("Determining common resolution for all videos...")
-        target_width, target_height = determine_common_resolution(file_list)
-        print(f"Common resolution set to {target_width}x{target_height}.")
-
-        # Re-encode all videos to the common resolution
-        reencoded_files = reencode_videos(file_list, target_width, target_height, temp_dir)
-
-        # Create a temporary file to hold the list of re-encoded files
-        with tempfile.NamedTemporaryFile('w', delete=False) as temp_file:
-            for filename in reencoded_files:
-                # Escape single quotes in filenames
-                escaped_filename = filename.replace("'", "'\\''")
-                temp_file.write(f"file '{escaped_filename}'\n")
-            temp_filename = temp_file.name
-
-        # Construct and run the ffmpeg concat command
-        cmd = [
-            'ffmpeg', '-f', 'concat', '-safe', '0',
-            '-i', temp_filename, '-c', 'copy', output_filename
-        ]
-        try:
-            print(f"Concatenating videos into {output_filename}...")
-            subprocess.run(cmd, check=True)
-            print(f"Successfully created {output_filename}")
-            
-            # Archive the original input files after successful concatenation
-            archive_files(file_list)
-        except subprocess.CalledProcessError as e:
-            print(f"Error during ffmpeg execution: {e}")
-            sys.exit(1)
-        finally:
-            # Clean up the temporary concat list file
-            if os.path.exists(temp_filename):
-                os.remove(temp_filename)
+    # Probe every input once; the same properties decide both the resolution and the fast path
+    print("Determining common resolution for all videos...")
+    video_properties = probe_videos(file_list)
+
+    if len(set(video_properties)) == 1:
+        # All inputs already share resolution and codec parameters, so they can be stream-copied as-is
+        print("All videos share the same resolution and codec; skipping re-encode.")
+        concat_copy(file_list, output_filename)
+    else:
+        concat_reencode(file_list, video_properties, output_filename)
+
+    # Archive the original input files after successful concatenation
+    archive_files(file_list)
 
 if __name__ == '__main__':
     main()
@@ -2,9 +2,64 @@
 
 import sys
 import os
-from PIL import Image, ImageOps
+import subprocess
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
 import numpy as np
-from moviepy.editor import ImageSequenceClip, VideoFileClip
+
+# Frame rate of the generated MP4
+OUTPUT_FPS = 25
+
+# Maximum number of decoded frames waiting to be written to ffmpeg
+FRAME_QUEUE_SIZE = 16
+
+def produce_gif_frames(im, padded_width, padded_height, frame_queue, stop_event, result):
+    """
+    Decode GIF frames, pad them to even dimensions and queue them as raw RGB bytes at OUTPUT_FPS.
+
+    Each frame is queued once as (frame_bytes, count), where count is the number of output frames
+    it covers, so a long hold costs no more memory than a single frame. Repeat counts come from the rounded
+    cumulative timestamps, so rounding errors do not build up. None is queued when decoding ends.
+    The GIF's total duration, the number of output frames and any error are stored in result.
+    """
+    try:
+        n_frames = getattr(im, 'n_frames', 1)
+
+        # Padding is baked into one zeroed buffer that every frame is copied into
+        padded = np.zeros((padded_height, padded_width, 3), dtype=np.uint8)
+        total_duration = 0.0
+        frames_written = 0
+
+        for i in range(n_frames):
+            if stop_event.is_set():
+                break
+            im.seek(i)
+            duration_ms = im.info.get('duration', 100)
+            if duration_ms == 0:
+                duration_ms = 100  # Default to 100 ms if duration is zero
+            total_duration += duration_ms / 1000  # Convert to seconds
+
+            # Frames that already decode as RGB are read in place; convert() would only copy them
+            frame = im if im.mode == 'RGB' else im.convert('RGB')
+            arr = np.asarray(frame, dtype=np.uint8)
+            padded[:arr.shape[0], :arr.shape[1]] = arr
+
+            # Repeat the frame for its share of the constant-rate timeline
+            count = int(round(total_duration * OUTPUT_FPS)) - frames_written
+            if count <= 0 and i == n_frames - 1 and frames_written == 0:
+                count = 1  # Always emit at least one frame
+            if count > 0:
+                frame_queue.put((padded.tobytes(), count))
+                frames_written += count
+
+        result['total_duration'] = total_duration
+        result['frames_written'] = frames_written
+    except Exception as e:
+        result['error'] = e
+    finally:
+        frame_queue.put(None)
 
 def convert_gif_to_mp4(input_file_path):
     if not os.path.isfile(input_file_path):
@@ -16,43 +71,12 @@ def convert_gif_to_mp4(input_file_path):
         return False  # Indicate failure
 
     try:
-        # Read frames and durations from the GIF
         im = Image.open(input_file_path)
 
-        frames = []
-        durations = []
-
-        try:
-            while True:
-                frame = im.copy().convert('RGB')
-                duration_ms = im.info.get('duration', 100)
-                if duration_ms == 0:
-                    duration_ms = 100  # Default to 100 ms if duration is zero
-                durations.append(duration_ms / 1000)  # Convert to seconds
-
-                # Ensure dimensions are divisible by 2
-                width, height = frame.size
-                new_width = width + (width % 2)
-                new_height = height + (height % 2)
-
-                if (width != new_width) or (height != new_height):
-                    # Pad the image to make dimensions even
-                    frame = ImageOps.expand(
-                        frame,
-                        border=(0, 0, new_width - width, new_height - height),
-                        fill=(0, 0, 0)
-                    )
-
-                frames.append(np.array(frame))
-
-                im.seek(im.tell() + 1)
-        except EOFError:
-            pass  # End of sequence
-
-        total_duration = sum(durations)
-
-        # Create an ImageSequenceClip with the frames and durations
-        clip = ImageSequenceClip(frames, durations=durations)
+        # Ensure dimensions are divisible by 2
+        width, height = im.size
+        new_width = width + (width % 2)
+        new_height = height + (height % 2)
 
         # Define output file path
         input_dir = os.path.dirname(input_file_path)
@@ -60,29 +84,71 @@ def convert_gif_to_mp4(input_file_path):
         output_base_name = os.path.splitext(input_base_name)[0] + '.mp4'
         output_file_path = os.path.join(input_dir, output_base_name)
 
-        # Write the video file with fps=25
-        clip.write_videofile(
-            output_file_path,
-            fps=25,  # Added fps parameter here
-            codec='libx264',
-            audio=False,
-            threads=1,
-            ffmpeg_params=[
-                '-pix_fmt', 'yuv420p',
-                '-profile:v', 'baseline',
-                '-level', '3.0'
-            ],
-            verbose=False,
-            logger=None
+        # Pipe the raw RGB frames straight into ffmpeg
+        ffmpeg_cmd = [
+            'ffmpeg', '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'rgb24',
+            '-s', f'{new_width}x{new_height}',
+            '-framerate', str(OUTPUT_FPS),
+            '-i', '-',
+            '-c:v', 'libx264',
+            '-preset', 'veryfast',
+            '-threads', '2',
+            '-pix_fmt', 'yuv420p',
+            '-profile:v', 'baseline',
+            '-level', '3.0',
+            '-movflags', '+faststart',
+            output_file_path
+        ]
+        process = subprocess.Popen(ffmpeg_cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+
+        # Decode on a background thread while this thread feeds the encoder
+        frame_queue = queue.Queue(maxsize=FRAME_QUEUE_SIZE)
+        stop_event = threading.Event()
+        result = {}
+        producer = threading.Thread(
+            target=produce_gif_frames,
+            args=(im, new_width, new_height, frame_queue, stop_event, result),
+            daemon=True
         )
+        producer.start()
 
-        # Close the clip
-        clip.close()
-
-        # Verify that the output video has the same duration
-        output_clip = VideoFileClip(output_file_path)
-        mp4_duration = output_clip.duration
-        output_clip.close()
+        item = ()  # Anything but None means the producer has not reached the end of the queue
+        try:
+            while (item := frame_queue.get()) is not None:
+                frame_bytes, count = item
+                for _ in range(count):
+                    process.stdin.write(frame_bytes)
+        except BrokenPipeError:
+            pass  # ffmpeg exited early; its error output is reported below
+        finally:
+            # However writing stopped, the producer may be blocked on a full queue:
+            # ask it to stop and drain the queue until it has finished
+            if item is not None:
+                stop_event.set()
+                while frame_queue.get() is not None:
+                    pass
+            producer.join()
+            try:
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+
+        stderr = process.stderr.read()
+        process.wait()
+
+        if 'error' in result:
+            # ffmpeg has already finished a truncated MP4 from the frames it was given
+            if os.path.exists(output_file_path):
+                os.remove(output_file_path)
+            raise result['error']
+        if process.returncode != 0:
+            print(f"Error: ffmpeg failed to encode '{input_file_path}': {stderr.decode(errors='replace').strip()}")
+            return False  # Indicate failure
+
+        total_duration = result['total_duration']
+        mp4_duration = result['frames_written'] / OUTPUT_FPS
 
         # Compare durations
         duration_diff = abs(total_duration - mp4_duration)
@@ -110,22 +176,26 @@ def main():
 
     input_file_paths = args
 
-    for input_file_path in input_file_paths:
-        print(f"Processing '{input_file_path}'...")
-        success = convert_gif_to_mp4(input_file_path)
-
-        # If conversion succeeded and user did not request to save the original, delete the GIF
-        if success and (not save_original):
-            # Confirm the output MP4 exists before deleting
-            output_file = os.path.splitext(input_file_path)[0] + '.mp4'
-            if os.path.exists(output_file):
-                try:
-                    os.remove(input_file_path)
-                    print(f"Deleted original GIF: '{input_file_path}'.")
-                except Exception as e:
-                    print(f"Could not delete '{input_file_path}': {e}")
-
-        print("")  # Add an empty line for readability
+    # Convert the GIFs in parallel, one worker process per file
+    max_workers = min(len(input_file_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(convert_gif_to_mp4, input_file_paths)
+
+        for input_file_path, success in zip(input_file_paths, results):
+            print(f"Processed '{input_file_path}'.")
+
+            # If conversion succeeded and user did not request to save the original, delete the GIF
+            if success and (not save_original):
+                # Confirm the output MP4 exists before deleting
+                output_file = os.path.splitext(input_file_path)[0] + '.mp4'
+                if os.path.exists(output_file):
+                    try:
+                        os.remove(input_file_path)
+                        print(f"Deleted original GIF: '{input_file_path}'.")
+                    except Exception as e:
+                        print(f"Could not delete '{input_file_path}': {e}")
+
+            print("")  # Add an empty line for readability
 
 if __name__ == "__main__":
     main()
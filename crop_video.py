@@ -4,6 +4,24 @@ import subprocess
 import argparse
 import os
 import shutil  # Added for file operations
+import json
+import errno
+import re
+import shlex
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# Matches [mm:]ss[.fraction], e.g. "10.02", "00:10.02" or "5:15"
+TIME_STRING_PATTERN = re.compile(r'^(?:(\d+):)?(\d+)(?:\.(\d+))?$')
+
+# libx264 preset; cropping and trimming do not need the slower archival presets
+DEFAULT_PRESET = 'veryfast'
+
+# Threads per ffmpeg process, so parallel workers do not oversubscribe the CPU
+FFMPEG_THREADS = 2
+
+# Parsed ffprobe output, keyed by (absolute path, mtime, size)
+_probe_cache = {}
 
 def parse_time_string(time_str):
     """
@@ -11,34 +29,13 @@ def parse_time_string(time_str):
       1) mm:ss.dd (minutes:seconds[.fraction])
       2) ss.dd (just seconds[.fraction])
     """
-    # If there's no colon, interpret the entire string as seconds.
-    if ':' not in time_str:
-        try:
-            return float(time_str)
-        except ValueError as e:
-            print(f"Error parsing time string '{time_str}': {e}")
-            return None
-    else:
-        # Parse in the mm:ss.dd format
-        try:
-            mm_ss = time_str.split(':')
-            if len(mm_ss) != 2:
-                raise ValueError("Time format should be mm:ss.dd")
-            minutes = int(mm_ss[0])
-            seconds_fraction = mm_ss[1]
-            if '.' in seconds_fraction:
-                seconds, fraction = seconds_fraction.split('.')
-                seconds = int(seconds)
-                fraction = int(fraction)
-                fraction = fraction / (10 ** len(str(fraction)))
-            else:
-                seconds = int(seconds_fraction)
-                fraction = 0
-            total_seconds = minutes * 60 + seconds + fraction
-            return total_seconds
-        except Exception as e:
-            print(f"Error parsing time string '{time_str}': {e}")
-            return None
+    match = TIME_STRING_PATTERN.match(time_str)
+    if not match:
+        print(f"Error parsing time string '{time_str}': expected mm:ss.dd or ss.dd")
+        return None
+
+    minutes, seconds, fraction = match.groups()
+    return int(minutes or 0) * 60 + int(seconds) + (float('0.' + fraction) if fraction else 0.0)
 
 def format_time_for_filename(time_seconds):
     minutes = int(time_seconds // 60)
@@ -46,45 +43,55 @@ def format_time_for_filename(time_seconds):
     hundredths = int(round((time_seconds - int(time_seconds)) * 100))
     return f"{minutes:02d}{seconds:02d}{hundredths:02d}"
 
-def get_video_dimensions(input_file):
+def probe(input_file):
+    """
+    Run ffprobe once per input and cache the parsed JSON stream and format information.
+
+    The cache is keyed by absolute path, modification time and size, so a changed file is probed again.
+    Returns None if ffprobe fails.
+    """
+    st = os.stat(input_file)
+    key = (os.path.abspath(input_file), st.st_mtime, st.st_size)
+    if key in _probe_cache:
+        return _probe_cache[key]
+
     ffprobe_command = [
-        'ffprobe', '-v', 'error', '-select_streams', 'v:0', '-show_entries', 'stream=width,height',
-        '-of', 'csv=p=0:s=x', input_file
+        'ffprobe', '-v', 'error', '-print_format', 'json', '-show_format', '-show_streams', input_file
     ]
     result = subprocess.run(ffprobe_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-
     if result.returncode != 0:
-        print(f"Error getting video dimensions for '{input_file}': {result.stderr}")
-        return None, None
+        print(f"Error probing '{input_file}': {result.stderr}")
+        return None
 
-    output = result.stdout.strip()
-    if 'x' in output:
-        dimensions = output.split('x')[:2]
-        try:
-            width, height = map(int, dimensions)
-            return width, height
-        except ValueError:
-            print(f"Error parsing video dimensions from ffprobe output: '{output}'")
-            return None, None
-    else:
-        print(f"Unexpected output format from ffprobe for '{input_file}': '{output}'")
+    try:
+        info = json.loads(result.stdout)
+    except json.JSONDecodeError as e:
+        print(f"Error parsing ffprobe output for '{input_file}': {e}")
+        return None
+
+    _probe_cache[key] = info
+    return info
+
+def get_video_dimensions(input_file):
+    info = probe(input_file)
+    if info is None:
         return None, None
 
+    for stream in info.get('streams', []):
+        if stream.get('codec_type') == 'video':
+            try:
+                return int(stream['width']), int(stream['height'])
+            except (KeyError, ValueError):
+                break
+
+    print(f"Error parsing video dimensions from ffprobe output for '{input_file}'")
+    return None, None
+
 def get_video_duration(input_file):
-    command = [
-        'ffprobe',
-        '-v', 'error',
-        '-show_entries',
-        'format=duration',
-        '-of',
-        'default=noprint_wrappers=1:nokey=1',
-        input_file
-    ]
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if result.returncode != 0:
-        print(f"Error getting duration of video '{input_file}': {result.stderr}")
+    info = probe(input_file)
+    if info is None:
         return None
-    duration_str = result.stdout.strip()
+    duration_str = info.get('format', {}).get('duration', '')
     try:
         duration = float(duration_str)
         return duration
@@ -105,11 +112,12 @@ def generate_crop_filter(input_file, left, right, top, bottom):
         print(f"Invalid crop percentages for '{input_file}': left+right or top+bottom exceed 100% of video width or height.")
         return None
 
-    # Calculate crop dimensions based on percentages
-    crop_width = width - int((left + right) * width)
-    crop_height = height - int((top + bottom) * height)
-    x_offset = int(left * width)
-    y_offset = int(top * height)
+    # Calculate crop dimensions based on percentages, rounded down to even values so yuv420p
+    # output needs no implicit scaling
+    crop_width = (width - int((left + right) * width)) & ~1
+    crop_height = (height - int((top + bottom) * height)) & ~1
+    x_offset = int(left * width) & ~1
+    y_offset = int(top * height) & ~1
 
     # Ensure crop dimensions are positive
     if crop_width <= 0 or crop_height <= 0:
@@ -120,42 +128,19 @@ def generate_crop_filter(input_file, left, right, top, bottom):
     return crop_filter
 
 def has_audio_stream(input_file):
-    command = [
-        'ffprobe',
-        '-v', 'error',
-        '-select_streams', 'a',
-        '-show_entries', 'stream=index',
-        '-of', 'csv=p=0',
-        input_file
-    ]
-    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    if result.returncode != 0:
+    info = probe(input_file)
+    if info is None:
         return False
-    output = result.stdout.strip()
-    return output != ''
+    return any(stream.get('codec_type') == 'audio' for stream in info.get('streams', []))
 
 def generate_output_filename(input_file, left, right, top, bottom, start_time=None, end_time=None, remove_segment=False):
     # Extract the directory, file name, and extension
     directory = os.path.dirname(input_file)
     base_name, ext = os.path.splitext(os.path.basename(input_file))
 
-    # Create a suffix based on the cropping parameters
-    suffix_parts = []
-    if left > 0:
-        suffix_parts.append(f"l{int(left*100)}")
-    if right > 0:
-        suffix_parts.append(f"r{int(right*100)}")
-    if top > 0:
-        suffix_parts.append(f"t{int(top*100)}")
-    if bottom > 0:
-        suffix_parts.append(f"b{int(bottom*100)}")
-
-    # Include start and end times in the suffix
-    if start_time is not None:
-        suffix_parts.append(f"s{format_time_for_filename(start_time)}")
-    if end_time is not None:
-        suffix_parts.append(f"e{format_time_for_filename(end_time)}")
-
+    # Create a suffix from the cropping parameters, start/end times and cut flag
+    suffix_parts = [f"{label}{int(value*100)}" for label, value in (('l', left), ('r', right), ('t', top), ('b', bottom)) if value > 0]
+    suffix_parts += [f"{label}{format_time_for_filename(value)}" for label, value in (('s', start_time), ('e', end_time)) if value is not None]
     if remove_segment:
         suffix_parts.append("cut")
 
@@ -165,7 +150,7 @@ def generate_output_filename(input_file, left, right, top, bottom, start_time=No
     # Return the new output file path with suffix in the same directory
     return os.path.join(directory, f"{base_name}_{suffix}{ext}")
 
-def crop_video(input_file, left, right, top, bottom, start_time=None, end_time=None):
+def crop_video(input_file, left, right, top, bottom, start_time=None, end_time=None, verbose=False, preset=DEFAULT_PRESET):
     # Generate output filename based on input and crop parameters
     output_file = generate_output_filename(input_file, left, right, top, bottom, start_time, end_time)
 
@@ -173,90 +158,163 @@ def crop_video(input_file, left, right, top, bottom, start_time=None, end_time=N
     crop_filter = generate_crop_filter(input_file, left, right, top, bottom)
 
     # Construct the ffmpeg command
-    ffmpeg_command = ['ffmpeg', '-i', input_file]
+    ffmpeg_command = ['ffmpeg', '-hide_banner', '-loglevel', 'error']
 
-    # Add start and end times if provided
+    # Add start and end times if provided, as input options so frames before the start are not decoded
     if start_time is not None:
         ffmpeg_command += ['-ss', str(start_time)]
     if end_time is not None:
         ffmpeg_command += ['-to', str(end_time)]
-
-    # Add crop filter if specified
-    filter_chain = []
-    if crop_filter:
-        filter_chain.append(crop_filter)
+    ffmpeg_command += ['-i', input_file]
 
     output_ext = os.path.splitext(output_file)[1].lower()
 
     if output_ext == '.gif':
-        # For GIFs, use palette generation for better quality
-        palette_file = os.path.join(os.path.dirname(output_file), 'palette.png')
-
-        # First pass: generate palette
-        palettegen_command = ['ffmpeg', '-i', input_file]
-        if start_time is not None:
-            palettegen_command += ['-ss', str(start_time)]
-        if end_time is not None:
-            palettegen_command += ['-to', str(end_time)]
-        if filter_chain:
-            palettegen_command += ['-vf', ','.join(filter_chain + ['palettegen'])]
-        else:
-            palettegen_command += ['-vf', 'palettegen']
-        palettegen_command += ['-y', palette_file]
-
-        print(f"Generating palette with command: {' '.join(palettegen_command)}")
-        result = subprocess.run(palettegen_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        # For GIFs, generate and apply the palette in a single pass over the decoded frames
+        palette_graph = 'split[a][b];[a]palettegen[p];[b][p]paletteuse'
+        gif_command = ffmpeg_command + [
+            '-filter_complex', f"[0:v]{crop_filter},{palette_graph}" if crop_filter else f"[0:v]{palette_graph}",
+            '-threads', str(FFMPEG_THREADS), '-y', output_file
+        ]
 
-        if result.returncode != 0:
-            print(f"Error generating palette for GIF '{input_file}': {result.stderr}")
-            return None
-
-        # Second pass: create GIF using the palette
-        ffmpeg_command = ['ffmpeg', '-i', input_file, '-i', palette_file]
-        if start_time is not None:
-            ffmpeg_command += ['-ss', str(start_time)]
-        if end_time is not None:
-            ffmpeg_command += ['-to', str(end_time)]
-        filter_chain.append('paletteuse')
-        ffmpeg_command += ['-filter_complex', ','.join(filter_chain)]
-        ffmpeg_command += ['-y', output_file]
-
-        print(f"Creating GIF with command: {' '.join(ffmpeg_command)}")
-        result = subprocess.run(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if verbose:
+            print(f"Creating GIF with command: {shlex.join(gif_command)}")
+        result = subprocess.run(gif_command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
 
         if result.returncode == 0:
             print(f"GIF cropped successfully. Saved as '{output_file}'")
         else:
             print(f"Error cropping GIF '{input_file}': {result.stderr}")
-
-        # Clean up palette file
-        if os.path.exists(palette_file):
-            os.remove(palette_file)
     else:
         # Determine if the file has an audio stream
         audio_exists = has_audio_stream(input_file)
-        if audio_exists:
+        if audio_exists and start_time is None and end_time is None:
+            ffmpeg_command += ['-c:a', 'copy']  # A spatial crop leaves the audio untouched
+        elif audio_exists:
             ffmpeg_command += ['-c:a', 'aac']
         else:
             ffmpeg_command += ['-an']  # No audio
 
-        if filter_chain:
-            ffmpeg_command += ['-vf', ','.join(filter_chain)]
+        # Add crop filter if specified
+        if crop_filter:
+            ffmpeg_command += ['-vf', crop_filter]
 
-        ffmpeg_command += ['-c:v', 'libx264', '-y', output_file]
+        ffmpeg_command += ['-c:v', 'libx264', '-preset', preset, '-movflags', '+faststart',
+                           '-threads', str(FFMPEG_THREADS), '-y', output_file]
 
         # Run the ffmpeg command to crop the video
-        print(f"Running ffmpeg command: {' '.join(ffmpeg_command)}")
-        result = subprocess.run(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if verbose:
+            print(f"Running ffmpeg command: {shlex.join(ffmpeg_command)}")
+        result = subprocess.run(ffmpeg_command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
 
         if result.returncode == 0:
             print(f"Video cropped successfully. Saved as '{output_file}'")
         else:
             print(f"Error cropping video '{input_file}': {result.stderr}")
 
-    return output_file if os.path.exists(output_file) else None  # Return the output file path if successful
+    return output_file if result.returncode == 0 else None  # Return the output file path if successful
+
+def parse_crop_spec(spec):
+    """
+    Parse a --crop spec such as "l=0.1,r=0.1,t=0,b=0,s=10,e=20" into a dict with the crop
+    percentages l, r, t and b (default 0.0) and the start/end times s and e (default None).
+    Returns None if the spec is invalid.
+    """
+    crop_spec = {'l': 0.0, 'r': 0.0, 't': 0.0, 'b': 0.0, 's': None, 'e': None}
+    for item in spec.split(','):
+        key, sep, value = item.partition('=')
+        key = key.strip()
+        if not sep or key not in crop_spec:
+            print(f"Invalid crop spec '{spec}': expected comma-separated l=, r=, t=, b=, s= and e= values.")
+            return None
+        if key in ('s', 'e'):
+            crop_spec[key] = parse_time_string(value.strip())
+            if crop_spec[key] is None:
+                return None
+        else:
+            try:
+                crop_spec[key] = float(value)
+            except ValueError:
+                print(f"Invalid crop percentage '{value}' in crop spec '{spec}'.")
+                return None
+
+    if crop_spec['s'] is not None and crop_spec['e'] is not None and crop_spec['s'] >= crop_spec['e']:
+        print(f"Error: Start time must be less than end time in crop spec '{spec}'.")
+        return None
+    return crop_spec
+
+def crop_video_multi(input_file, crop_specs, verbose=False, preset=DEFAULT_PRESET):
+    """
+    Produce one output per crop spec from a single ffmpeg process, so the input is decoded once
+    no matter how many outputs are written. GIF outputs need their own palette pass, so for GIF
+    inputs each spec is handled by crop_video instead.
+
+    Returns the list of output files written.
+    """
+    if os.path.splitext(input_file)[1].lower() == '.gif':
+        output_files = []
+        for spec in crop_specs:
+            output_file = crop_video(input_file, spec['l'], spec['r'], spec['t'], spec['b'], spec['s'], spec['e'], verbose=verbose, preset=preset)
+            if output_file:
+                output_files.append(output_file)
+        return output_files
+
+    audio_exists = has_audio_stream(input_file)
+    count = len(crop_specs)
+
+    # Fan the decoded input out to one filter chain per output
+    filter_complex = [f"[0:v]split={count}" + ''.join(f"[v{idx}]" for idx in range(count))]
+    if audio_exists:
+        filter_complex.append(f"[0:a]asplit={count}" + ''.join(f"[a{idx}]" for idx in range(count)))
+
+    ffmpeg_command = ['ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', input_file]
+    output_files = []
+    output_args = []
+    for idx, spec in enumerate(crop_specs):
+        output_file = generate_output_filename(input_file, spec['l'], spec['r'], spec['t'], spec['b'], spec['s'], spec['e'])
+        output_files.append(output_file)
+
+        # Trim to the spec's time window, if any
+        trim_args = []
+        if spec['s'] is not None:
+            trim_args.append(f"start={spec['s']}")
+        if spec['e'] is not None:
+            trim_args.append(f"end={spec['e']}")
+        trim = ':'.join(trim_args)
+
+        video_chain = []
+        if trim:
+            video_chain += [f"trim={trim}", "setpts=PTS-STARTPTS"]
+        crop_filter = generate_crop_filter(input_file, spec['l'], spec['r'], spec['t'], spec['b'])
+        if crop_filter:
+            video_chain.append(crop_filter)
+        filter_complex.append(f"[v{idx}]{','.join(video_chain) or 'null'}[outv{idx}]")
+
+        output_args += ['-map', f"[outv{idx}]"]
+        if audio_exists:
+            audio_chain = [f"atrim={trim}", "asetpts=PTS-STARTPTS"] if trim else ['anull']
+            filter_complex.append(f"[a{idx}]{','.join(audio_chain)}[outa{idx}]")
+            output_args += ['-map', f"[outa{idx}]", '-c:a', 'aac']
+        else:
+            output_args += ['-an']  # No audio
+        output_args += ['-c:v', 'libx264', '-preset', preset, '-movflags', '+faststart',
+                        '-threads', str(FFMPEG_THREADS), '-y', output_file]
+
+    ffmpeg_command += ['-filter_complex', ';'.join(filter_complex)] + output_args
+
+    if verbose:
+        print(f"Running ffmpeg command: {shlex.join(ffmpeg_command)}")
+    result = subprocess.run(ffmpeg_command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+    if result.returncode != 0:
+        print(f"Error cropping video '{input_file}': {result.stderr}")
+        return []
+
+    for output_file in output_files:
+        print(f"Video cropped successfully. Saved as '{output_file}'")
+    return output_files
 
-def remove_segment(input_file, left, right, top, bottom, start_time, end_time):
+def remove_segment(input_file, left, right, top, bottom, start_time, end_time, verbose=False, preset=DEFAULT_PRESET):
     # Generate output filename
     output_file = generate_output_filename(input_file, left, right, top, bottom, start_time, end_time, remove_segment=True)
 
@@ -266,23 +324,22 @@ def remove_segment(input_file, left, right, top, bottom, start_time, end_time):
     # Determine if there is an audio stream
     audio_exists = has_audio_stream(input_file)
 
-    # Build the filter_complex
+    # Build the filter_complex. Input 0 is the part before the segment and input 1 the part after it,
+    # so the removed segment is never decoded.
     filter_complex = []
 
     # Start building the filter graph for video
     if crop_filter:
-        filter_complex.append(f"[0:v]{crop_filter},split=2[v1][v2]")
+        filter_complex.append(f"[0:v]{crop_filter},setpts=PTS-STARTPTS[v1a]")
+        filter_complex.append(f"[1:v]{crop_filter},setpts=PTS-STARTPTS[v2a]")
     else:
-        filter_complex.append(f"[0:v]split=2[v1][v2]")
-
-    filter_complex.append(f"[v1]trim=0:{start_time},setpts=PTS-STARTPTS[v1a]")
-    filter_complex.append(f"[v2]trim=start={end_time},setpts=PTS-STARTPTS[v2a]")
+        filter_complex.append(f"[0:v]setpts=PTS-STARTPTS[v1a]")
+        filter_complex.append(f"[1:v]setpts=PTS-STARTPTS[v2a]")
 
     if audio_exists:
         # Build the filter graph for audio
-        filter_complex.append(f"[0:a]asplit=2[a1][a2]")
-        filter_complex.append(f"[a1]atrim=0:{start_time},asetpts=PTS-STARTPTS[a1a]")
-        filter_complex.append(f"[a2]atrim=start={end_time},asetpts=PTS-STARTPTS[a2a]")
+        filter_complex.append(f"[0:a]asetpts=PTS-STARTPTS[a1a]")
+        filter_complex.append(f"[1:a]asetpts=PTS-STARTPTS[a2a]")
         # Concatenate video and audio streams
         filter_complex.append(f"[v1a][a1a][v2a][a2a]concat=n=2:v=1:a=1[outv][outa]")
     else:
@@ -293,8 +350,9 @@ def remove_segment(input_file, left, right, top, bottom, start_time, end_time):
 
     # Build ffmpeg command
     ffmpeg_command = [
-        'ffmpeg',
-        '-i', input_file,
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-to', str(start_time), '-i', input_file,
+        '-ss', str(end_time), '-i', input_file,
         '-filter_complex', filter_complex_str,
         '-map', '[outv]',
     ]
@@ -305,24 +363,26 @@ def remove_segment(input_file, left, right, top, bottom, start_time, end_time):
     else:
         ffmpeg_command += ['-an']  # No audio
 
-    ffmpeg_command += ['-c:v', 'libx264', '-y', output_file]
+    ffmpeg_command += ['-c:v', 'libx264', '-preset', preset, '-movflags', '+faststart',
+                       '-threads', str(FFMPEG_THREADS), '-y', output_file]
 
     # Run ffmpeg command
-    print(f"Running ffmpeg command: {' '.join(ffmpeg_command)}")
-    result = subprocess.run(ffmpeg_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if verbose:
+        print(f"Running ffmpeg command: {shlex.join(ffmpeg_command)}")
+    result = subprocess.run(ffmpeg_command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
 
     if result.returncode == 0:
         print(f"Segment removed successfully. Saved as '{output_file}'")
     else:
         print(f"Error removing segment from video '{input_file}': {result.stderr}")
 
-    return output_file if os.path.exists(output_file) else None  # Return the output file path if successful
+    return output_file if result.returncode == 0 else None  # Return the output file path if successful
 
 def create_archive_directory(file_directory):
     archive_dir = os.path.join(file_directory, "archive")
     if not os.path.exists(archive_dir):
         try:
-            os.makedirs(archive_dir)
+            os.makedirs(archive_dir, exist_ok=True)  # Another worker may create it at the same time
             print(f"Created archive directory at '{archive_dir}'.")
         except Exception as e:
             print(f"Error creating archive directory '{archive_dir}': {e}")
@@ -331,10 +391,25 @@ def create_archive_directory(file_directory):
         print(f"Archive directory already exists at '{archive_dir}'.")
     return archive_dir
 
+def move_into_directory(file_path, directory):
+    """
+    Move a file into a directory with a single rename when both are on the same filesystem,
+    falling back to shutil.move (copy and delete) across filesystems.
+    """
+    destination = os.path.join(directory, os.path.basename(file_path))
+    if os.path.exists(destination):
+        raise FileExistsError(f"Destination path '{destination}' already exists")
+    try:
+        os.rename(file_path, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(file_path, destination)
+
 def move_files_to_archive(input_file, archive_dir):
     try:
         # Move the original input file
-        shutil.move(input_file, archive_dir)
+        move_into_directory(input_file, archive_dir)
         print(f"Moved '{input_file}' to '{archive_dir}'.")
     except Exception as e:
         print(f"Error moving '{input_file}' to archive: {e}")
@@ -345,7 +420,7 @@ def move_files_to_archive(input_file, archive_dir):
 
     if os.path.exists(screen_file):
         try:
-            shutil.move(screen_file, archive_dir)
+            move_into_directory(screen_file, archive_dir)
             print(f"Moved '{screen_file}' to '{archive_dir}'.")
         except Exception as e:
             print(f"Error moving '{screen_file}' to archive: {e}")
@@ -361,6 +436,75 @@ def run_grid_creator(new_file):
     except FileNotFoundError:
         print(f"grid_creator.py not found in the current directory.")
 
+def process_one(input_file, args):
+    """
+    Crop or cut a single input file according to the parsed command-line arguments, then archive
+    the original and optionally build its screenshot grid. Runs in a worker process.
+    """
+    # Ensure the input file exists
+    if not os.path.exists(input_file):
+        print(f"Error: Input file '{input_file}' does not exist.")
+        return
+
+    print(f"\nStarting processing for file: {input_file}")
+
+    # Parse start and end times if provided
+    start_time = None
+    if args.s:
+        start_time = parse_time_string(args.s)
+        if start_time is None:
+            print(f"Invalid start time format: {args.s}")
+            return
+
+    end_time = None
+    if args.e:
+        end_time = parse_time_string(args.e)
+        if end_time is None:
+            print(f"Invalid end time format: {args.e}")
+            return
+
+    # Ensure that start time is less than end time
+    if start_time is not None and end_time is not None and start_time >= end_time:
+        print("Error: Start time must be less than end time.")
+        return
+
+    if args.crop:
+        # Several crops of the same input, written by one ffmpeg process
+        crop_specs = [parse_crop_spec(spec) for spec in args.crop]
+        if any(spec is None for spec in crop_specs):
+            return
+        output_files = crop_video_multi(input_file, crop_specs, verbose=args.verbose, preset=args.preset)
+    elif args.c:
+        # Ensure both start_time and end_time are provided
+        if start_time is None or end_time is None:
+            print("Error: Both start time (--s) and end time (--e) must be provided when using --c.")
+            return
+        output_file = remove_segment(input_file, args.l, args.r, args.t, args.b, start_time, end_time, verbose=args.verbose, preset=args.preset)
+        output_files = [output_file] if output_file else []
+    else:
+        # Use the provided crop percentages or the defaults (0.0 if not provided)
+        output_file = crop_video(input_file, args.l, args.r, args.t, args.b, start_time, end_time, verbose=args.verbose, preset=args.preset)
+        output_files = [output_file] if output_file else []
+
+    if output_files:
+        # Determine the directory of the input file
+        input_dir = os.path.dirname(os.path.abspath(input_file))
+        # Create archive directory in the input file's directory
+        archive_dir = create_archive_directory(input_dir)
+        if archive_dir is None:
+            print(f"Failed to create or access the archive directory for '{input_file}'. Skipping archiving and grid creation.")
+            return
+
+        # Move original files to archive
+        move_files_to_archive(input_file, archive_dir)
+
+        # Run grid_creator.py if the --screens flag is provided.
+        if args.screens:
+            for output_file in output_files:
+                run_grid_creator(output_file)
+    else:
+        print(f"Processing failed for '{input_file}'. Skipping archiving and grid creation.")
+
 def main():
     parser = argparse.ArgumentParser(description="Crop multiple videos by a percentage using ffmpeg.")
     parser.add_argument("input_files", nargs='+', help="Paths to the input video files")
@@ -371,69 +515,22 @@ def main():
     parser.add_argument("--s", help="Start time (e.g., 10.02 for 10.02s or 00:10.02 for 10.02s)")
     parser.add_argument("--e", help="End time (e.g., 45.5 for 45.5s or 00:45.5 for 45.5s)")
     parser.add_argument("--c", action='store_true', help="Remove the segment between --s and --e and concatenate the rest.")
+    parser.add_argument("--crop", action='append',
+                        help=("Crop spec such as \"l=0.1,r=0.1,t=0,b=0,s=10,e=20\"; repeat to write several crops of each "
+                              "input from a single decode. When given, --l/--r/--t/--b/--s/--e/--c are ignored."))
     # Changed flag name from --no-screens to --screens
     parser.add_argument("--screens", action='store_true',
                         help="If provided, create the screenshot grid (via grid_creator.py) as is done presently.")
+    parser.add_argument("--verbose", action='store_true', help="Print the ffmpeg commands before running them.")
+    parser.add_argument("--preset", default=DEFAULT_PRESET,
+                        help=f"libx264 encoding preset (default: {DEFAULT_PRESET}).")
 
     args = parser.parse_args()
 
-    # Process each input file
-    for input_file in args.input_files:
-        # Ensure the input file exists
-        if not os.path.exists(input_file):
-            print(f"Error: Input file '{input_file}' does not exist.")
-            continue
-
-        print(f"\nStarting processing for file: {input_file}")
-
-        # Parse start and end times if provided
-        start_time = None
-        if args.s:
-            start_time = parse_time_string(args.s)
-            if start_time is None:
-                print(f"Invalid start time format: {args.s}")
-                continue
-
-        end_time = None
-        if args.e:
-            end_time = parse_time_string(args.e)
-            if end_time is None:
-                print(f"Invalid end time format: {args.e}")
-                continue
-
-        # Ensure that start time is less than end time
-        if start_time is not None and end_time is not None and start_time >= end_time:
-            print("Error: Start time must be less than end time.")
-            continue
-
-        output_file = None
-        if args.c:
-            # Ensure both start_time and end_time are provided
-            if start_time is None or end_time is None:
-                print("Error: Both start time (--s) and end time (--e) must be provided when using --c.")
-                continue
-            output_file = remove_segment(input_file, args.l, args.r, args.t, args.b, start_time, end_time)
-        else:
-            # Use the provided crop percentages or the defaults (0.0 if not provided)
-            output_file = crop_video(input_file, args.l, args.r, args.t, args.b, start_time, end_time)
-
-        if output_file:
-            # Determine the directory of the input file
-            input_dir = os.path.dirname(os.path.abspath(input_file))
-            # Create archive directory in the input file's directory
-            archive_dir = create_archive_directory(input_dir)
-            if archive_dir is None:
-                print(f"Failed to create or access the archive directory for '{input_file}'. Skipping archiving and grid creation.")
-                continue
-
-            # Move original files to archive
-            move_files_to_archive(input_file, archive_dir)
-
-            # Run grid_creator.py if the --screens flag is provided.
-            if args.screens:
-                run_grid_creator(output_file)
-        else:
-            print(f"Processing failed for '{input_file}'. Skipping archiving and grid creation.")
+    # Process the input files in parallel; each ffmpeg is limited to FFMPEG_THREADS threads
+    max_workers = max(1, min(len(args.input_files), (os.cpu_count() or 1) // FFMPEG_THREADS))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(process_one, args.input_files, repeat(args)))
 
 if __name__ == "__main__":
     main()
@@ -2,35 +2,43 @@
 import sys
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+# ffprobe options that stop reading after the container header instead of scanning the payload
+HEADER_ONLY_PROBE_ARGS = ["-probesize", "32K", "-analyzeduration", "0"]
 
 def get_duration(file_path):
     """
     Returns the duration of the video file in seconds (as a float) using ffprobe.
+
+    The first probe only reads the container header, which is enough for MP4/MOV where the duration
+    sits in the moov box. If that does not yield a duration, the file is probed again in full.
     """
     try:
-        # Build the ffprobe command.
-        # This command returns just the duration in seconds.
-        cmd = [
-            "ffprobe",
-            "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            file_path
-        ]
-        # Run the command and capture the output.
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True,
-            check=True
-        )
-        duration_str = result.stdout.strip()
-        if duration_str:
-            return float(duration_str)
-        else:
-            print(f"Warning: Could not determine duration for {file_path}.")
-            return 0.0
+        for probe_args in (HEADER_ONLY_PROBE_ARGS, []):
+            # Build the ffprobe command.
+            # This command returns just the duration in seconds.
+            cmd = [
+                "ffprobe",
+                "-v", "error",
+                *probe_args,
+                "-show_entries", "format=duration",
+                "-of", "default=noprint_wrappers=1:nokey=1",
+                file_path
+            ]
+            # Run the command and capture the output.
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                universal_newlines=True,
+                check=True
+            )
+            duration_str = result.stdout.strip()
+            if duration_str and duration_str != "N/A":
+                return float(duration_str)
+        print(f"Warning: Could not determine duration for {file_path}.")
+        return 0.0
     except subprocess.CalledProcessError as e:
         print(f"Error processing {file_path}: {e.stderr}")
         return 0.0
@@ -67,14 +75,21 @@ def main():
         print("Usage: {} file1.mp4 file2.mp4 ...".format(os.path.basename(sys.argv[0])))
         sys.exit(1)
     
-    total_duration = 0.0
+    file_paths = []
     for file_path in sys.argv[1:]:
         if not os.path.isfile(file_path):
             print(f"File not found: {file_path}")
             continue
-        duration = get_duration(file_path)
-        print(f"{file_path}: {duration:.2f} seconds")
-        total_duration += duration
+        file_paths.append(file_path)
+
+    # Run the ffprobe calls concurrently; each thread just waits on its subprocess.
+    total_duration = 0.0
+    if file_paths:
+        with ThreadPoolExecutor(max_workers=min(32, len(file_paths))) as executor:
+            durations = list(executor.map(get_duration, file_paths))
+        for file_path, duration in zip(file_paths, durations):
+            print(f"{file_path}: {duration:.2f} seconds")
+            total_duration += duration
 
     formatted = format_total_duration(total_duration)
     print(f"Input Files have total duration of {formatted}")
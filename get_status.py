@@ -2,8 +2,16 @@
 
 import os
 import argparse
+import functools
 import yaml
 
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+@functools.lru_cache(maxsize=1)
 def load_config():
     """
     Loads configuration from a YAML file named 'config.yaml' located in the same
@@ -16,14 +24,14 @@ def load_config():
     config_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'config.yaml')
     try:
         with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
+            config = yaml.load(f, Loader=SafeLoader)
     except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found at {config_path}")
     return config
 
-def get_directory_stats(dir_path):
+def get_directory_stats(name, parent_fd):
     """
-    Given a directory path, return:
+    Given a directory name and an open file descriptor of its parent directory, return:
       - The total number of files in that directory (NON-recursively).
       - The total size of those files in bytes.
     
@@ -32,12 +40,17 @@ def get_directory_stats(dir_path):
     total_size = 0
     file_count = 0
 
-    # Use scandir for the top-level contents only
-    with os.scandir(dir_path) as entries:
-        for entry in entries:
-            if entry.is_file():
-                file_count += 1
-                total_size += os.path.getsize(entry.path)
+    # Open the directory relative to its parent and scandir the fd, so the path is never re-resolved
+    dir_fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY, dir_fd=parent_fd)
+    try:
+        # Use scandir for the top-level contents only
+        with os.scandir(dir_fd) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    file_count += 1
+                    total_size += entry.stat().st_size
+    finally:
+        os.close(dir_fd)
 
     return file_count, total_size
 
@@ -83,8 +96,9 @@ def main():
     # List to store (subdir name, file count, total size in bytes) for matching subdirectories
     results = []
 
-    # Walk the directory tree (topdown=True so we can modify `dirs` in-place)
-    for root, dirs, _ in os.walk(directory, topdown=True):
+    # Walk the directory tree (topdown=True so we can modify `dirs` in-place).
+    # fwalk also yields an open fd for each directory, which the stats lookups work relative to.
+    for root, dirs, _, root_fd in os.fwalk(directory, topdown=True):
         # Find which subdirectories in the current directory match the suffix
         matched_subdirs = [d for d in dirs if d.endswith(suffix)]
         
@@ -94,8 +108,7 @@ def main():
 
         # For each matching subdirectory, gather its stats (non-recursively)
         for md in matched_subdirs:
-            subdir_path = os.path.join(root, md)
-            file_count, total_size_bytes = get_directory_stats(subdir_path)
+            file_count, total_size_bytes = get_directory_stats(md, root_fd)
             results.append((md, file_count, total_size_bytes))
 
     # Sort the results by total size in bytes (largest first)
@@ -2,14 +2,130 @@
 
 import os
 import cv2
+import numpy as np
 import sys
 import math
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 
-def create_screenshots(video_path, output_dir, current_idx, total_files, approx_elements, no_grid=False):
+# PyAV is optional; it is only needed to read keyframes for --fast
+try:
+    import av
+except ImportError:
+    av = None
+
+# Pillow is optional; it is only needed to write --no-grid --webp animations
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Number of threads writing individual screenshots in --no-grid mode
+SCREENSHOT_WRITE_WORKERS = 4
+
+# Screenshots are only previews, so they are written at a lower quality with optimized Huffman tables
+JPEG_WRITE_PARAMS = [cv2.IMWRITE_JPEG_QUALITY, 85, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+
+# Display time of each screenshot in a --webp animation, and its encoding quality
+WEBP_FRAME_DURATION_MS = 2000
+WEBP_QUALITY = 85
+
+# Decode straight through to the next target frame unless it is further away than this;
+# beyond roughly one GOP, seeking to the nearest keyframe is cheaper than decoding forward
+SEQUENTIAL_DECODE_MAX_GAP = 250
+
+def open_video_capture(video_path):
+    """
+    Opens video_path with the FFmpeg backend and hardware accelerated decoding when available,
+    falling back to the default backend otherwise.
+    """
+    if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+        cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG, (
+            cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY,
+            cv2.CAP_PROP_HW_DEVICE, 0,
+        ))
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(video_path)
+
+def read_frames(cap, frame_indices, fps):
+    """
+    Reads the frames at the given indices from cap, decoding each frame at most once.
+    Seeks are done by timestamp when fps is known, which uses the container index
+    instead of counting frames. Returns a dict mapping each frame index that could be read to its frame.
+    """
+    frames = {}
+    position = None
+    for frame_idx in np.unique(frame_indices).tolist():
+        if position is None or not 0 <= frame_idx - position <= SEQUENTIAL_DECODE_MAX_GAP:
+            if fps > 0:
+                cap.set(cv2.CAP_PROP_POS_MSEC, 1000 * frame_idx / fps)
+            else:
+                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
+            position = frame_idx
+
+        # Skip over the frames in between without converting them to images
+        while position < frame_idx:
+            if not cap.grab():
+                break
+            position += 1
+        if position < frame_idx:
+            position = None
+            continue
+
+        ret, frame = cap.read()
+        if ret:
+            frames[frame_idx] = frame
+            position = frame_idx + 1
+        else:
+            position = None
+
+    return frames
+
+def read_keyframes(video_path, frame_indices):
+    """
+    Reads the keyframe at or before each of the given frame indices using PyAV.
+    Only keyframes are decoded, so the tiles are approximate but far fewer frames are decoded.
+    Returns a dict mapping each frame index that could be read to its frame.
+    """
+    frames = {}
+    try:
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.codec_context.skip_frame = 'NONKEY'
+            rate = stream.average_rate or stream.guessed_rate
+            start = stream.start_time or 0
+            for frame_idx in np.unique(frame_indices).tolist():
+                container.seek(start + int(frame_idx / rate / stream.time_base), stream=stream)
+                for frame in container.decode(stream):
+                    frames[frame_idx] = frame.to_ndarray(format='bgr24')
+                    break
+    except Exception as e:
+        print(f"Error reading keyframes from {video_path}: {e}")
+    return frames
+
+def write_webp_animation(path, frames):
+    """
+    Writes the BGR frames to path as the pages of a single animated WebP.
+    Returns True on success, False otherwise.
+    """
+    images = [Image.fromarray(np.ascontiguousarray(frame[:, :, ::-1])) for frame in frames]
+    try:
+        images[0].save(path, 'WEBP', save_all=True, append_images=images[1:],
+                       duration=WEBP_FRAME_DURATION_MS, loop=0, quality=WEBP_QUALITY)
+    except (OSError, ValueError) as e:
+        print(f"Error writing {path}: {e}")
+        return False
+    return True
+
+def create_screenshots(video_path, output_dir, current_idx, total_files, approx_elements, no_grid=False, fast=False,
+                       webp=False):
     """
     Creates screenshots from the given video_path.
-    If no_grid is True, saves each screenshot individually.
+    If no_grid is True, saves each screenshot individually,
+    or as the pages of one animated WebP if webp is also True.
     Otherwise, concatenates them into a single grid image.
+    If fast is True, each screenshot is the nearest keyframe before its position.
     """
 
     base_name = os.path.basename(video_path)
@@ -31,7 +147,7 @@ def create_screenshots(video_path, output_dir, current_idx, total_files, approx_
             return
 
     # Open the video
-    cap = cv2.VideoCapture(video_path)
+    cap = open_video_capture(video_path)
     if not cap.isOpened():
         print(f"Failed to open video {video_path}")
         return
@@ -39,6 +155,7 @@ def create_screenshots(video_path, output_dir, current_idx, total_files, approx_
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     frame_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     frame_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS)
 
     # Determine orientation and best rows x cols distribution
     is_landscape = frame_width > frame_height
@@ -50,71 +167,81 @@ def create_screenshots(video_path, output_dir, current_idx, total_files, approx_
         rows = max_rows
         cols = math.ceil(approx_elements / rows)
 
-    # We'll collect frames in memory (for the grid) or write them out individually
-    grid = None
-
-    screenshot_index = 0
-    for i in range(rows):
-        row = None
-        for j in range(cols):
-            # Calculate which frame index to grab
-            # evenly spaced across the total_frames
-            frame_idx = int((i * cols + j) * total_frames / (rows * cols))
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            ret, frame = cap.read()
-
-            if not ret:
-                print(f"Failed to read frame at index {frame_idx} from {video_path}")
-                continue
-
-            screenshot_index += 1
-
-            if no_grid:
-                # Save this frame as a separate file
-                # e.g. "videoName_screen_1.jpg", "videoName_screen_2.jpg", ...
-                out_filename = f"{name_no_ext}_screen_{screenshot_index}.jpg"
-                out_path = os.path.join(output_dir, out_filename)
-                cv2.imwrite(out_path, frame)
-            else:
-                # For the grid, accumulate horizontally in row
-                if row is None:
-                    row = frame
-                else:
-                    try:
-                        row = cv2.hconcat([row, frame])
-                    except cv2.error as e:
-                        print(f"Error concatenating frames horizontally: {e}")
-                        cap.release()
-                        return
+    # Calculate which frame indices to grab, evenly spaced across the total_frames,
+    # and decode them in a single forward pass (or only the keyframes in fast mode)
+    frame_indices = np.arange(rows * cols, dtype=np.int64) * total_frames // (rows * cols)
+    if fast:
+        frames = read_keyframes(video_path, frame_indices)
+    else:
+        frames = read_frames(cap, frame_indices, fps)
 
-        # Accumulate each finished row vertically to form the full grid
-        if not no_grid and row is not None:
-            if grid is None:
-                grid = row
-            else:
-                try:
-                    grid = cv2.vconcat([grid, row])
-                except cv2.error as e:
-                    print(f"Error concatenating rows vertically: {e}")
-                    cap.release()
-                    return
+    # For the grid, every tile is copied straight into one canvas allocated up front;
+    # tiles whose frame could not be read are left black
+    grid = None
+    if not no_grid and frames:
+        tile_shape = next(iter(frames.values())).shape
+        tile_height, tile_width = tile_shape[:2]
+        grid = np.zeros((rows * tile_height, cols * tile_width) + tile_shape[2:], dtype=np.uint8)
 
     cap.release()
 
     # Ensure the output directory exists
     os.makedirs(output_dir, exist_ok=True)
 
-    if no_grid:
+    # Individual screenshots are encoded and written on background threads,
+    # or collected for a single WebP file
+    webp_frames = []
+    with ThreadPoolExecutor(max_workers=SCREENSHOT_WRITE_WORKERS) as write_pool:
+        screenshot_index = 0
+        for i in range(rows):
+            for j in range(cols):
+                frame_idx = frame_indices[i * cols + j]
+                frame = frames.get(frame_idx)
+
+                if frame is None:
+                    print(f"Failed to read frame at index {frame_idx} from {video_path}")
+                    continue
+
+                screenshot_index += 1
+
+                if no_grid and webp:
+                    webp_frames.append(frame)
+                elif no_grid:
+                    # Save this frame as a separate file
+                    # e.g. "videoName_screen_1.jpg", "videoName_screen_2.jpg", ...
+                    out_filename = f"{name_no_ext}_screen_{screenshot_index}.jpg"
+                    out_path = os.path.join(output_dir, out_filename)
+                    write_pool.submit(cv2.imwrite, out_path, frame, JPEG_WRITE_PARAMS)
+                else:
+                    if frame.shape != tile_shape:
+                        print(f"Error placing frame {frame_idx} in grid: expected shape {tile_shape}, got {frame.shape}")
+                        return
+                    grid[i * tile_height:(i + 1) * tile_height, j * tile_width:(j + 1) * tile_width] = frame
+
+    if no_grid and webp:
+        # Write every screenshot into one file, e.g. "videoName_screens.webp"
+        webp_path = os.path.join(output_dir, f"{name_no_ext}_screens.webp")
+        if not webp_frames:
+            print(f"{current_idx}/{total_files} - No valid frames were found to create screenshots for {base_name}")
+        elif write_webp_animation(webp_path, webp_frames):
+            print(f"{current_idx}/{total_files} - Screenshots saved as {webp_path}")
+    elif no_grid:
         # We have already saved each screenshot individually
         print(f"{current_idx}/{total_files} - Individual screenshots saved to '{output_dir}' for {base_name}")
     else:
         # Write out the single grid image
         if grid is not None:
-            cv2.imwrite(screenshot_path, grid)
+            cv2.imwrite(screenshot_path, grid, JPEG_WRITE_PARAMS)
             print(f"{current_idx}/{total_files} - Screenshot grid saved as {screenshot_path}")
         else:
             print(f"{current_idx}/{total_files} - No valid frames were found to create a grid for {base_name}")
 
+def init_worker():
+    """
+    Limits each worker process to one OpenCV thread, since the videos themselves are decoded in parallel.
+    """
+    cv2.setNumThreads(1)
+
 if __name__ == '__main__':
     # Collect arguments (excluding script name)
     args = sys.argv[1:]
@@ -122,8 +249,10 @@ if __name__ == '__main__':
     # Initialize flags
     no_grid = False
     use_input_dir = False
+    fast = False
+    webp = False
 
-    # Check for --no-grid and --k flags
+    # Check for --no-grid, --k, --fast and --webp flags
     if '--no-grid' in args:
         no_grid = True
         args.remove('--no-grid')
@@ -132,13 +261,23 @@ if __name__ == '__main__':
         use_input_dir = True
         args.remove('--k')
 
+    if '--fast' in args:
+        fast = True
+        args.remove('--fast')
+
+    if '--webp' in args:
+        webp = True
+        args.remove('--webp')
+
     # Now we expect at least 2 arguments: <approx_elements> <video1> [<video2> ...]
     if len(args) < 2:
-        print("Usage: python grid_creator.py <approx_elements> [--no-grid] [--k] <video_files...>")
+        print("Usage: python grid_creator.py <approx_elements> [--no-grid] [--k] [--fast] [--webp] <video_files...>")
         print("Example (grid in 'screens' folder): python grid_creator.py 9 video1.mp4 video2.mov video3.gif")
         print("Example (no grid): python grid_creator.py 9 --no-grid video1.mp4 video2.mov")
         print("Example (grid in input file's directory): python grid_creator.py 9 --k video1.mp4 video2.mov")
         print("Example (no grid and grid in input file's directory): python grid_creator.py 9 --no-grid --k video1.mp4 video2.mov")
+        print("Example (no grid, one animated WebP): python grid_creator.py 9 --no-grid --webp video1.mp4 video2.mov")
+        print("Example (keyframes only, faster but approximate): python grid_creator.py 9 --fast video1.mp4 video2.mov")
         sys.exit(1)
 
     # First arg is number of elements
@@ -148,10 +287,19 @@ if __name__ == '__main__':
         print("Error: Number of elements must be an integer.")
         sys.exit(1)
 
+    if fast and av is None:
+        print("Error: --fast needs PyAV (pip install av).")
+        sys.exit(1)
+
+    if no_grid and webp and Image is None:
+        print("Error: --webp needs Pillow (pip install Pillow).")
+        sys.exit(1)
+
     # The rest are video files
     video_files = args[1:]
     total_files = len(video_files)
 
+    jobs = []
     for idx, video_file in enumerate(video_files, start=1):
         video_file = os.path.abspath(video_file)
 
@@ -171,12 +319,28 @@ if __name__ == '__main__':
         else:
             output_dir = os.path.join(video_dir, "screens")
 
-        create_screenshots(
-            video_file,
-            output_dir,
-            current_idx=idx,
-            total_files=total_files,
-            approx_elements=approx_elements,
-            no_grid=no_grid
-        )
-a
\ No newline at end of file
+        jobs.append((video_file, output_dir, idx))
+
+    # Each video is decoded independently, so process them in parallel
+    if jobs:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker) as executor:
+            futures = {
+                executor.submit(
+                    create_screenshots,
+                    video_file,
+                    output_dir,
+                    current_idx=idx,
+                    total_files=total_files,
+                    approx_elements=approx_elements,
+                    no_grid=no_grid,
+                    fast=fast,
+                    webp=webp
+                ): video_file
+                for video_file, output_dir, idx in jobs
+            }
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error creating screenshots for {futures[future]}: {e}")
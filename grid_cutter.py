@@ -2,9 +2,57 @@
 
 import sys
 import os
+import errno
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
+import numpy as np
+import cv2
 import shutil
 
+# Prefer libjpeg-turbo's SIMD encoder for JPEG tiles when PyTurboJPEG is installed
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    turbo_jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    turbo_jpeg = None
+
+# Extensions that OpenCV can encode directly; anything else is saved through PIL
+CV2_EXTENSIONS = {'jpg', 'jpeg', 'png', 'webp', 'bmp', 'tif', 'tiff'}
+
+# JPEG quality used for the encoded tiles
+JPEG_QUALITY = 92
+
+# OpenCV encoder options per extension; WebP and PNG match what PIL's save() used to write
+# (lossy WebP at quality 80 rather than OpenCV's lossless default, and zlib level 6 for PNG)
+CV2_ENCODE_PARAMS = {
+    'jpg': [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY],
+    'jpeg': [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY],
+    'webp': [cv2.IMWRITE_WEBP_QUALITY, 80],
+    'png': [cv2.IMWRITE_PNG_COMPRESSION, 6],
+}
+
+def to_cv2_array(img):
+    """Return the image as an array in OpenCV channel order, or None if its mode has no direct equivalent."""
+    if img.mode == 'L':
+        return np.asarray(img)
+    if img.mode == 'RGB':
+        return np.asarray(img)[:, :, ::-1]
+    if img.mode == 'RGBA':
+        return np.asarray(img)[:, :, [2, 1, 0, 3]]
+    return None
+
+def save_tile(tile, path, extension):
+    """Encode one tile with TurboJPEG or OpenCV and write it to path."""
+    if turbo_jpeg is not None and extension in ('jpg', 'jpeg') and tile.ndim == 3 and tile.shape[2] == 3:
+        with open(path, 'wb') as f:
+            f.write(turbo_jpeg.encode(np.ascontiguousarray(tile), quality=JPEG_QUALITY, pixel_format=TJPF_BGR))
+        return
+
+    ok, buf = cv2.imencode('.' + extension, tile, CV2_ENCODE_PARAMS.get(extension, []))
+    if not ok:
+        raise ValueError(f"Could not encode tile {path}")
+    buf.tofile(path)
+
 def grid_cutter(image_path, M, N):
     # Open the image
     img = Image.open(image_path)
@@ -32,25 +80,44 @@ def grid_cutter(image_path, M, N):
     # Move the original image to the new folder after all cuts are done
     original_copy_path = os.path.join(grid_folder_path, os.path.basename(image_path))
 
-    # Loop through the grid and save each section
-    for i in range(M):
-        for j in range(N):
-            left = j * section_width
-            upper = i * section_height
-            right = (j + 1) * section_width
-            lower = (i + 1) * section_height
-
-            # Crop the image
-            section = img.crop((left, upper, right, lower))
-
-            # Generate the output filename for each section
-            section_filename = f'{input_filename}_{i}_{j}.{input_extension}'
-
-            # Save each section in the grid folder in the original format
-            section.save(os.path.join(grid_folder_path, section_filename), image_format)
-
-    # Now move the original image to the new folder
-    shutil.move(image_path, original_copy_path)
+    arr = to_cv2_array(img) if input_extension in CV2_EXTENSIONS else None
+    if arr is not None:
+        # Slice the tiles out of one decoded array and encode them in parallel; imencode releases the GIL
+        with ThreadPoolExecutor() as executor:
+            futures = []
+            for i in range(M):
+                for j in range(N):
+                    tile = arr[i * section_height:(i + 1) * section_height, j * section_width:(j + 1) * section_width]
+                    section_filename = f'{input_filename}_{i}_{j}.{input_extension}'
+                    futures.append(executor.submit(save_tile, tile, os.path.join(grid_folder_path, section_filename), input_extension))
+            for future in futures:
+                future.result()
+    else:
+        # Loop through the grid and save each section
+        for i in range(M):
+            for j in range(N):
+                left = j * section_width
+                upper = i * section_height
+                right = (j + 1) * section_width
+                lower = (i + 1) * section_height
+
+                # Crop the image
+                section = img.crop((left, upper, right, lower))
+
+                # Generate the output filename for each section
+                section_filename = f'{input_filename}_{i}_{j}.{input_extension}'
+
+                # Save each section in the grid folder in the original format
+                section.save(os.path.join(grid_folder_path, section_filename), image_format)
+
+    # Now move the original image to the new folder. It is a subfolder of the image's own
+    # directory, so a single rename almost always works; copy only if it is another filesystem.
+    try:
+        os.replace(image_path, original_copy_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(image_path, original_copy_path)
 
 if __name__ == '__main__':
     if len(sys.argv) < 3:
@@ -1,10 +1,27 @@
 #!/usr/bin/env python3
 import argparse
+import json
 import subprocess
 import os
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-import json
+
+# PyAV is optional; without it every boomerang goes through the chunked ffmpeg path
+try:
+    import av
+except ImportError:
+    av = None
+
+# Length of the pieces reversed one at a time for the boomerang effect. ffmpeg's reverse
+# filter buffers every frame it is given, so this bounds its memory use; pieces are cut
+# at keyframes, so in practice each one is at least one GOP long.
+REVERSE_SEGMENT_SECONDS = 2
+
+# Largest decoded size (yuv420p) of a clip that is reversed in memory with PyAV;
+# anything bigger, or anything with audio, is reversed by ffmpeg in pieces instead.
+PYAV_BOOMERANG_MAX_BYTES = 1024 * 1024 * 1024
 
 def parse_arguments():
     parser = argparse.ArgumentParser(
@@ -50,27 +67,26 @@ def has_audio(input_file):
     Uses ffprobe to check if the input file has at least one audio stream.
     Returns True if audio exists, False otherwise.
     """
+    # Only the first audio stream is probed; any output at all means there is one
     command = [
         'ffprobe',
         '-v', 'error',
-        '-select_streams', 'a',
+        '-select_streams', 'a:0',
         '-show_entries', 'stream=codec_type',
-        '-of', 'json',
+        '-of', 'csv=p=0',
         input_file
     ]
     try:
         result = subprocess.run(
             command,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
+            stderr=subprocess.PIPE
         )
         if result.returncode != 0:
             print(f"ffprobe error for '{input_file}':")
-            print(result.stderr)
+            print(result.stderr.decode(errors='replace'))
             return False
-        probe = json.loads(result.stdout)
-        return any(stream.get('codec_type') == 'audio' for stream in probe.get('streams', []))
+        return result.stdout.strip() != b''
     except Exception as e:
         print(f"An exception occurred while probing '{input_file}': {e}")
         return False
@@ -115,6 +131,158 @@ def loop_mp4_file(input_file, n):
         print(f"An exception occurred while processing '{input_file}': {e}")
         return False
 
+def run_ffmpeg(command, description):
+    """
+    Runs an ffmpeg command, printing its error output on failure.
+    Returns True on success, False otherwise.
+    """
+    result = subprocess.run(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True
+    )
+    if result.returncode != 0:
+        print(f"Error {description}:")
+        print(result.stderr)
+        return False
+    return True
+
+def reverse_mp4_file(input_path, output_path, audio_exists, work_dir):
+    """
+    Writes a reversed copy of input_path to output_path without holding the whole video in memory.
+    The input is cut into short keyframe-aligned pieces, each piece is reversed on its own,
+    and the reversed pieces are joined back together in reverse order.
+    The pieces are stored as lossless H.264 with PCM audio in Matroska, so the final boomerang
+    encode is the only lossy generation and no per-piece AAC priming finds its way into the join.
+    Returns True on success, False otherwise.
+    """
+    maps = ['-map', '0:v:0'] + (['-map', '0:a:0'] if audio_exists else [])
+    segment_pattern = os.path.join(work_dir, 'segment%05d.mp4')
+    if not run_ffmpeg([
+        'ffmpeg', '-y',
+        '-i', str(input_path),
+        *maps,
+        '-c', 'copy',
+        '-f', 'segment',
+        '-segment_time', str(REVERSE_SEGMENT_SECONDS),
+        '-reset_timestamps', '1',
+        segment_pattern
+    ], f"splitting '{input_path}' for reversal"):
+        return False
+
+    segments = sorted(name for name in os.listdir(work_dir) if name.startswith('segment'))
+    reversed_segments = []
+    for segment in reversed(segments):
+        segment_path = os.path.join(work_dir, segment)
+        reversed_path = os.path.join(work_dir, 'reversed_' + os.path.splitext(segment)[0] + '.mkv')
+        command = [
+            'ffmpeg', '-y',
+            '-i', segment_path,
+            '-vf', 'reverse',
+            '-c:v', 'libx264', '-preset', 'ultrafast', '-qp', '0'
+        ]
+        if audio_exists:
+            command += ['-af', 'areverse', '-c:a', 'pcm_s16le']
+        command.append(reversed_path)
+        if not run_ffmpeg(command, f"reversing '{segment_path}'"):
+            return False
+        os.remove(segment_path)
+        reversed_segments.append(reversed_path)
+
+    # The reversed pieces share the same encoding settings, so they can be joined without re-encoding;
+    # PCM has no encoder delay, so the audio stays in step with the video across the joins
+    concat_list = os.path.join(work_dir, 'reversed.txt')
+    with open(concat_list, 'w') as f:
+        for reversed_path in reversed_segments:
+            escaped_path = reversed_path.replace("'", "'\\''")
+            f.write(f"file '{escaped_path}'\n")
+
+    return run_ffmpeg([
+        'ffmpeg', '-y',
+        '-f', 'concat', '-safe', '0',
+        '-i', concat_list,
+        '-c', 'copy',
+        str(output_path)
+    ], f"joining the reversed pieces of '{input_path}'")
+
+def pyav_can_reencode(input_file):
+    """
+    True if boomerang_with_pyav can re-encode the first video stream without losing anything the
+    ffmpeg path keeps. PyAV writes square pixels at a constant rate with no rotation or colour tags,
+    so anamorphic clips and clips with a display matrix, colour metadata or a variable frame rate
+    are left to ffmpeg.
+    """
+    command = [
+        'ffprobe',
+        '-v', 'error',
+        '-select_streams', 'v:0',
+        '-show_entries',
+        'stream=r_frame_rate,avg_frame_rate,sample_aspect_ratio,color_space,color_transfer,color_primaries'
+        ':stream_tags=rotate:stream_side_data',
+        '-of', 'json',
+        input_file
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        return False
+    try:
+        stream = json.loads(result.stdout)['streams'][0]
+    except (json.JSONDecodeError, KeyError, IndexError):
+        return False
+
+    if stream.get('tags', {}).get('rotate'):
+        return False
+    if any(side_data.get('side_data_type') == 'Display Matrix' for side_data in stream.get('side_data_list', [])):
+        return False
+    if stream.get('sample_aspect_ratio', '1:1') not in ('1:1', '0:1'):
+        return False
+    if any(stream.get(key, 'unknown') != 'unknown' for key in ('color_space', 'color_transfer', 'color_primaries')):
+        return False
+    # A variable frame rate shows up as an average rate that differs from the base rate
+    return stream.get('r_frame_rate') == stream.get('avg_frame_rate')
+
+def boomerang_with_pyav(input_path, output_path, n):
+    """
+    Builds a video-only boomerang by decoding the clip once with PyAV and re-encoding
+    its frames forwards and backwards, without any reverse filter.
+    Returns True on success, or None if the clip is too large or unsuitable for this path.
+    """
+    if not pyav_can_reencode(str(input_path)):
+        return None
+
+    with av.open(str(input_path)) as container:
+        in_stream = container.streams.video[0]
+        rate = in_stream.average_rate or in_stream.guessed_rate
+        width = in_stream.codec_context.width
+        height = in_stream.codec_context.height
+        if not rate or width % 2 or height % 2:
+            return None
+
+        # Estimate the decoded size before decoding anything
+        frame_count = in_stream.frames
+        if not frame_count and container.duration:
+            frame_count = int(container.duration / av.time_base * rate)
+        if not frame_count or frame_count * width * height * 3 // 2 > PYAV_BOOMERANG_MAX_BYTES:
+            return None
+
+        frames = [frame.to_ndarray(format='yuv420p') for frame in container.decode(in_stream)]
+
+    with av.open(str(output_path), 'w') as output:
+        stream = output.add_stream('libx264', rate=rate)
+        stream.width = width
+        stream.height = height
+        stream.pix_fmt = 'yuv420p'
+        for i in range(n):
+            # Reversing the list is free; even playthroughs run forwards, odd ones backwards
+            for array in (frames if i % 2 == 0 else frames[::-1]):
+                frame = av.VideoFrame.from_ndarray(array, format='yuv420p')
+                for packet in stream.encode(frame):
+                    output.mux(packet)
+        for packet in stream.encode():
+            output.mux(packet)
+    return True
+
 def boomerang_mp4_file(input_file, n):
     input_path = Path(input_file)
     output_filename = f"{input_path.stem}_boomerang{n}{input_path.suffix}"
@@ -125,66 +293,46 @@ def boomerang_mp4_file(input_file, n):
     # Check if the input has audio.
     audio_exists = has_audio(input_file)
 
-    if audio_exists:
-        # Construct the filter_complex for both video and audio (reverse both).
-        filter_complex = "[0:v]reverse[vrev]; [0:a]areverse[arev]; "
-
-        # Build stream list.
-        stream_list = []
-        for i in range(n):
-            if i % 2 == 0:
-                # Forward playthrough.
-                stream_list.append("[0:v][0:a]")
-            else:
-                # Reversed playthrough.
-                stream_list.append("[vrev][arev]")
-        streams_concat = ''.join(stream_list)
-        filter_complex += f"{streams_concat}concat=n={n}:v=1:a=1[outv][outa]"
+    try:
+        # Short silent clips are reversed in memory, skipping the intermediate files entirely
+        if av is not None and n > 1 and not audio_exists:
+            try:
+                built = boomerang_with_pyav(input_path, output_path, n)
+            except Exception as e:
+                print(f"PyAV could not build the boomerang for '{input_file}' ({e}); using ffmpeg instead.")
+                built = None
+            if built:
+                print(f"Successfully created '{output_path}'.")
+                return True
 
-        command = [
-            'ffmpeg',
-            '-y',  # Overwrite output files without asking.
-            '-i', str(input_path),
-            '-filter_complex', filter_complex,
-            '-map', '[outv]',
-            '-map', '[outa]',
-            str(output_path)
-        ]
-    else:
-        # Construct the filter_complex for video only.
-        filter_complex = "[0:v]reverse[vrev]; "
+        with tempfile.TemporaryDirectory() as work_dir:
+            command = ['ffmpeg', '-y', '-i', str(input_path)]  # Overwrite output files without asking.
 
-        stream_list = []
-        for i in range(n):
-            if i % 2 == 0:
-                stream_list.append("[0:v]")
-            else:
-                stream_list.append("[vrev]")
-        streams_concat = ''.join(stream_list)
-        filter_complex += f"{streams_concat}concat=n={n}:v=1:a=0[outv]"
+            # The reversed playthrough is prepared separately, so the final graph holds no reverse filter.
+            if n > 1:
+                reversed_path = os.path.join(work_dir, 'reversed.mkv')
+                if not reverse_mp4_file(input_path, reversed_path, audio_exists, work_dir):
+                    print(f"Error processing '{input_file}' with boomerang effect.")
+                    return False
+                command += ['-i', reversed_path]
 
-        command = [
-            'ffmpeg',
-            '-y',  # Overwrite output files without asking.
-            '-i', str(input_path),
-            '-filter_complex', filter_complex,
-            '-map', '[outv]',
-            '-c:a', 'copy',  # Attempt to copy audio if exists.
-            str(output_path)
-        ]
+            # Build stream list: even playthroughs are forward (input 0), odd ones reversed (input 1).
+            stream_list = []
+            for i in range(n):
+                source = i % 2
+                stream_list.append(f"[{source}:v][{source}:a]" if audio_exists else f"[{source}:v]")
+            streams_concat = ''.join(stream_list)
 
-    try:
-        result = subprocess.run(
-            command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+            if audio_exists:
+                filter_complex = f"{streams_concat}concat=n={n}:v=1:a=1[outv][outa]"
+                command += ['-filter_complex', filter_complex, '-map', '[outv]', '-map', '[outa]']
+            else:
+                filter_complex = f"{streams_concat}concat=n={n}:v=1:a=0[outv]"
+                command += ['-filter_complex', filter_complex, '-map', '[outv]']
+            command.append(str(output_path))
 
-        if result.returncode != 0:
-            print(f"Error processing '{input_file}' with boomerang effect:")
-            print(result.stderr)
-            return False
+            if not run_ffmpeg(command, f"processing '{input_file}' with boomerang effect"):
+                return False
 
         print(f"Successfully created '{output_path}'.")
         return True
@@ -219,20 +367,33 @@ def main():
 
     validate_arguments(n, b, input_files)
 
-    for input_file in input_files:
-        if n is not None:
-            success = loop_mp4_file(input_file, n)
-        elif b is not None:
-            success = boomerang_mp4_file(input_file, b)
-        else:
-            print("Error: Either --n or --b must be specified.")
-            sys.exit(1)
-        
-        if success:
-            # Move the original input file to the archive folder.
-            archive_file(input_file)
-        else:
-            print(f"Failed to process '{input_file}'. Continuing with next file.")
+    if n is not None:
+        process_file = loop_mp4_file
+        count = n
+    elif b is not None:
+        process_file = boomerang_mp4_file
+        count = b
+    else:
+        print("Error: Either --n or --b must be specified.")
+        sys.exit(1)
+
+    # Each file is an independent ffmpeg run, and ffmpeg already uses several threads itself
+    max_workers = max(1, min(len(input_files), (os.cpu_count() or 2) // 2))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(process_file, input_file, count): input_file for input_file in input_files}
+        for future in as_completed(futures):
+            input_file = futures[future]
+            try:
+                success = future.result()
+            except Exception as e:
+                print(f"An exception occurred while processing '{input_file}': {e}")
+                success = False
+
+            if success:
+                # Move the original input file to the archive folder.
+                archive_file(input_file)
+            else:
+                print(f"Failed to process '{input_file}'. Continuing with next file.")
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,30 @@
 import sys
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+# Number of items copied at once when a folder is on a different device than the destination
+CROSS_DEVICE_WORKERS = 4
+
+def move_item(source, target, same_device):
+    """
+    Move source to target. On the same device a plain rename is used when nothing exists
+    at the target yet; otherwise shutil.move decides, e.g. moving into an existing directory
+    or copying across devices.
+    """
+    try:
+        print(f"Moving '{source}' to '{target}'")
+        if same_device and not os.path.lexists(target):
+            os.rename(source, target)
+        else:
+            shutil.move(source, target)
+    except Exception as e:
+        print(f"Failed to move '{source}' -> '{target}': {e}")
+
+def move_items(moves):
+    """Move each (source, target) pair across devices, in order."""
+    for source, target in moves:
+        move_item(source, target, same_device=False)
 
 def main():
     # Path to which you want to move all contents
@@ -18,12 +42,20 @@ def main():
         print(f"Destination '{destination}' does not exist or is not a directory.")
         sys.exit(1)
 
+    destination_device = os.stat(destination).st_dev
+
+    # Cross-device moves are copies, so they are collected and run in parallel afterwards.
+    # Moves to the same target stay together so they still happen in argument order.
+    cross_device_moves = {}
+
     # Loop through each folder provided as an argument
     for folder in sys.argv[1:]:
         folder_path = os.path.abspath(folder)
         if not os.path.isdir(folder_path):
             print(f"Skipping '{folder}': Not a valid directory.")
             continue
+
+        same_device = os.stat(folder_path).st_dev == destination_device
         
         # Move contents of each folder (files and subfolders)
         for item in os.listdir(folder_path):
@@ -31,11 +63,14 @@ def main():
             target = os.path.join(destination, item)
             
             # Attempt to move each item
-            try:
-                print(f"Moving '{source}' to '{target}'")
-                shutil.move(source, target)
-            except Exception as e:
-                print(f"Failed to move '{source}' -> '{target}': {e}")
+            if same_device:
+                move_item(source, target, same_device=True)
+            else:
+                cross_device_moves.setdefault(target, []).append((source, target))
+
+    if cross_device_moves:
+        with ThreadPoolExecutor(max_workers=CROSS_DEVICE_WORKERS) as executor:
+            list(executor.map(move_items, cross_device_moves.values()))
 
 if __name__ == "__main__":
     main()
@@ -44,18 +44,95 @@ def send_file_to_trash(file_path):
     except Exception as e:
         print(f"Error sending {file_path} to trash: {e}")
 
-def find_associated_mp4(jpg_file):
-    base, _ = os.path.splitext(jpg_file)
+def trash_files(paths):
+    """
+    Send files to trash in a single batched send2trash call,
+    falling back to one call per file if the batch fails.
+    """
+    if not paths:
+        return
+    try:
+        send2trash(paths)
+        for file_path in paths:
+            print(f"Sent to trash: {file_path}")
+        return
+    except Exception as e:
+        print(f"Error sending files to trash in one batch ({e}); retrying one at a time.")
+    for file_path in paths:
+        if not os.path.lexists(file_path):
+            # The failed batch already moved this one before it stopped
+            print(f"Sent to trash: {file_path}")
+            continue
+        send_file_to_trash(file_path)
+
+def find_associated_mp4(base):
     if base.endswith('-screen'):
         base = base[:-7]  # Remove '-screen' suffix
     associated_mp4 = base + '.mp4'
     return associated_mp4
 
-def find_associated_screen_jpg(mp4_file):
-    base, _ = os.path.splitext(mp4_file)
-    screen_jpg = f"{base}-screen.jpg"
+def find_associated_screen_jpg(base):
+    screen_jpg = base + '-screen.jpg'
     return screen_jpg
 
+def split_extension(file_path):
+    """
+    Split file_path into its base and lower-cased extension, like os.path.splitext
+    but with a single scan for the last dot.
+    """
+    dot = file_path.rfind('.')
+    if dot <= file_path.rfind(os.sep) + 1:
+        return file_path, ''
+    return file_path[:dot], file_path[dot:].lower()
+
+def trash_mp4(file_path, base, destination, to_trash):
+    # Trash the .mp4 file.
+    to_trash[file_path] = None
+    # Trash the associated '-screen.jpg' file if it exists.
+    screen_file = find_associated_screen_jpg(base)
+    if os.path.isfile(screen_file):
+        to_trash[screen_file] = None
+    else:
+        print(f"No associated screen file found for: {file_path}")
+
+def trash_jpg(file_path, base, destination, to_trash):
+    # Trash the .jpg file.
+    to_trash[file_path] = None
+    # Trash the associated .mp4 file if it exists.
+    associated_mp4 = find_associated_mp4(base)
+    if os.path.isfile(associated_mp4):
+        to_trash[associated_mp4] = None
+    else:
+        print(f"Associated mp4 file for '{file_path}' not found. Only the jpg was trashed.")
+
+def move_mp4(file_path, base, destination, to_trash):
+    # Move the .mp4 file.
+    move_file(file_path, destination)
+    # Find and trash the associated '-screen.jpg' file.
+    screen_file = find_associated_screen_jpg(base)
+    if os.path.isfile(screen_file):
+        to_trash[screen_file] = None
+    else:
+        print(f"No associated screen file found for: {file_path}")
+
+def move_jpg(file_path, base, destination, to_trash):
+    # Find the associated .mp4 file.
+    associated_mp4 = find_associated_mp4(base)
+    if os.path.isfile(associated_mp4):
+        # Move the associated .mp4 file.
+        move_file(associated_mp4, destination)
+        # Trash the .jpg file.
+        to_trash[file_path] = None
+    else:
+        print(f"Associated mp4 file for '{file_path}' not found. Skipping.")
+
+# Trash mode: trash both the input file and its associated screen file.
+TRASH_HANDLERS = {'.mp4': trash_mp4, '.jpg': trash_jpg, '.jpeg': trash_jpg}
+
+# Default mode: move .mp4 files to destination and trash associated screen files,
+# or, if a .jpg is provided, move the associated .mp4 file and trash the .jpg.
+MOVE_HANDLERS = {'.mp4': move_mp4, '.jpg': move_jpg, '.jpeg': move_jpg}
+
 def main():
     args = parse_arguments()
     files = args.files
@@ -73,60 +150,28 @@ def main():
     else:
         destination = None  # Not used in trash mode
 
+    handlers = TRASH_HANDLERS if args.trash else MOVE_HANDLERS
+
+    # Files are sent to trash together at the end, in one round-trip to the OS.
+    # A dict keeps them in order without duplicates.
+    to_trash = {}
+
     for file_path in files:
+        if file_path in to_trash:
+            print(f"Skipping '{file_path}': already queued for trash.")
+            continue
         if not os.path.isfile(file_path):
             print(f"Warning: '{file_path}' does not exist or is not a file. Skipping.")
             continue
 
-        base, ext = os.path.splitext(file_path)
-        ext = ext.lower()
-
-        if args.trash:
-            # Trash mode: trash both the input file and its associated screen file.
-            if ext == '.mp4':
-                # Trash the .mp4 file.
-                send_file_to_trash(file_path)
-                # Trash the associated '-screen.jpg' file if it exists.
-                screen_file = find_associated_screen_jpg(file_path)
-                if os.path.isfile(screen_file):
-                    send_file_to_trash(screen_file)
-                else:
-                    print(f"No associated screen file found for: {file_path}")
-            elif ext in ['.jpg', '.jpeg']:
-                # Trash the .jpg file.
-                send_file_to_trash(file_path)
-                # Trash the associated .mp4 file if it exists.
-                associated_mp4 = find_associated_mp4(file_path)
-                if os.path.isfile(associated_mp4):
-                    send_file_to_trash(associated_mp4)
-                else:
-                    print(f"Associated mp4 file for '{file_path}' not found. Only the jpg was trashed.")
-            else:
-                print(f"Unsupported file type: '{file_path}'. Only .mp4 and .jpg files are supported. Skipping.")
-        else:
-            # Default mode: move .mp4 files to destination and trash associated screen files,
-            # or, if a .jpg is provided, move the associated .mp4 file and trash the .jpg.
-            if ext == '.mp4':
-                # Move the .mp4 file.
-                move_file(file_path, destination)
-                # Find and trash the associated '-screen.jpg' file.
-                screen_file = find_associated_screen_jpg(file_path)
-                if os.path.isfile(screen_file):
-                    send_file_to_trash(screen_file)
-                else:
-                    print(f"No associated screen file found for: {file_path}")
-            elif ext in ['.jpg', '.jpeg']:
-                # Find the associated .mp4 file.
-                associated_mp4 = find_associated_mp4(file_path)
-                if os.path.isfile(associated_mp4):
-                    # Move the associated .mp4 file.
-                    move_file(associated_mp4, destination)
-                    # Trash the .jpg file.
-                    send_file_to_trash(file_path)
-                else:
-                    print(f"Associated mp4 file for '{file_path}' not found. Skipping.")
-            else:
-                print(f"Unsupported file type: '{file_path}'. Only .mp4 and .jpg files are supported. Skipping.")
+        base, ext = split_extension(file_path)
+        handler = handlers.get(ext)
+        if handler is None:
+            print(f"Unsupported file type: '{file_path}'. Only .mp4 and .jpg files are supported. Skipping.")
+            continue
+        handler(file_path, base, destination, to_trash)
+
+    trash_files(list(to_trash))
 
 if __name__ == "__main__":
     main()
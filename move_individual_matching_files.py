@@ -3,7 +3,7 @@
 import sys
 import os
 import shutil
-import glob
+import re
 
 def get_root_name(filename):
     """
@@ -27,7 +27,10 @@ def main():
     if len(sys.argv) < 2:
         print(f"Usage: {sys.argv[0]} <file1> [file2] [file3] ...")
         sys.exit(1)
-    
+
+    # Names in each directory, listed once and shared by every argument in that directory
+    directory_listings = {}
+
     for arg in sys.argv[1:]:
         # Convert the supplied argument to an absolute path
         input_path = os.path.abspath(arg)
@@ -36,7 +39,8 @@ def main():
             print(f"Warning: {arg} does not exist. Skipping.")
             continue
 
-        # Identify the directory of the input file
+        # Identify the directory of the input file. It comes from an absolute, normalized path,
+        # so every path joined onto it below is too and can be compared as a plain string.
         directory = os.path.dirname(input_path)      # e.g. /home/user/videos
         base_dir_name = os.path.basename(directory)  # e.g. videos
 
@@ -53,26 +57,28 @@ def main():
         mp4_path = os.path.join(directory, root_name + ".mp4")
         if os.path.exists(mp4_path):
             dest_path = os.path.join(moved_dir, os.path.basename(mp4_path))
-            if os.path.abspath(mp4_path) != os.path.abspath(dest_path):
+            if mp4_path != dest_path:
                 print(f"Moving {mp4_path} -> {dest_path}")
                 shutil.move(mp4_path, dest_path)
             else:
                 print(f"Skipping {mp4_path} (already in destination).")
 
         # 2) Move all "screen" files, i.e. <root_name>-screen.* or <root_name>-screens.*
-        screen_patterns = [
-            os.path.join(directory, root_name + "-screen.*"),
-            os.path.join(directory, root_name + "-screens.*")
-        ]
-        
-        for pattern in screen_patterns:
-            for screen_file in glob.glob(pattern):
-                dest_path = os.path.join(screens_dir, os.path.basename(screen_file))
-                if os.path.abspath(screen_file) != os.path.abspath(dest_path):
-                    print(f"Moving {screen_file} -> {dest_path}")
-                    shutil.move(screen_file, dest_path)
-                else:
-                    print(f"Skipping {screen_file} (already in destination).")
+        if directory not in directory_listings:
+            with os.scandir(directory) as entries:
+                directory_listings[directory] = [entry.name for entry in entries]
+        names = directory_listings[directory]
+        screen_pattern = re.compile(re.escape(root_name) + r'-screens?\..*', re.DOTALL)
+
+        for name in [name for name in names if screen_pattern.fullmatch(name)]:
+            screen_file = os.path.join(directory, name)
+            dest_path = os.path.join(screens_dir, name)
+            if screen_file != dest_path:
+                print(f"Moving {screen_file} -> {dest_path}")
+                shutil.move(screen_file, dest_path)
+                names.remove(name)
+            else:
+                print(f"Skipping {screen_file} (already in destination).")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,12 +1,38 @@
 #!/usr/bin/env python3
 
 import os
+import errno
 import re
 import shutil
 import argparse
 import unicodedata
 import sys
 import subprocess
+import functools
+import bisect
+
+# Matches file names whose name part (before the extension) ends with _dd-dd-dd (e.g., _12-50-10).
+# Group 1 is the part before the timestamp, group 2 the extension as os.path.splitext would split it.
+TIMESTAMPED_FILE_PATTERN = re.compile(r'^(.*?)_\d{2}-\d{2}-\d{2}(\.[^.]*)?$')
+
+# Finds a _dd-dd-dd timestamp anywhere in a file name
+TIMESTAMP_PATTERN = re.compile(r'_\d{2}-\d{2}-\d{2}')
+
+# Matches text wrapped in '22', which is what quotes turn into in some file names
+QUOTED_22_PATTERN = re.compile(r'22(.*?)22', re.IGNORECASE)
+
+def rename_or_move(source, destination):
+    """
+    Move source to destination with a single rename, falling back to shutil.move
+    (copy and delete) only when they are on different filesystems. That copy keeps only
+    the contents: modification time and permissions are not preserved.
+    """
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination, copy_function=shutil.copyfile)
 
 def create_review_folder(folder_path):
     """
@@ -23,6 +49,12 @@ def create_review_folder(folder_path):
         print(f"Review folder already exists: {review_folder_path}")
     return review_folder_path
 
+# Deletes every ASCII character that normalize_filename would drop
+ASCII_DROP_TABLE = str.maketrans('', '', ''.join(
+    chr(c) for c in range(128) if not (chr(c).isalnum() or chr(c) in '_ ')
+))
+
+@functools.lru_cache(maxsize=None)
 def normalize_filename(filename):
     """
     Normalize the filename to remove special characters and punctuation.
@@ -30,7 +62,11 @@ def normalize_filename(filename):
     Example: "Submission" -> 22Submission22 -> submission
     """
     # Replace sequences like 22...22 with what’s inside, even if there are spaces:
-    filename = re.sub(r'22(.*?)22', r'\1', filename, flags=re.IGNORECASE)
+    filename = QUOTED_22_PATTERN.sub(r'\1', filename)
+
+    # NFKD leaves ASCII unchanged, so plain ASCII names only need the unwanted characters removed.
+    if filename.isascii():
+        return filename.translate(ASCII_DROP_TABLE).lower()
 
     # Now, use NFKD normalization and keep only alphanumerics, underscores, and spaces.
     nfkd_form = unicodedata.normalize('NFKD', filename)
@@ -43,16 +79,17 @@ def find_matching_files(folder_path):
     """
     Find all files matching specific patterns in the folder.
     """
-    # Pattern to match files ending with _dd-dd-dd (e.g., _12-50-10)
-    pattern = re.compile(r'^(.*?)_\d{2}-\d{2}-\d{2}$')
     matched_files = {}
-    all_files = os.listdir(folder_path)
+    with os.scandir(folder_path) as entries:
+        all_files = [entry.name for entry in entries]
+    all_files_set = set(all_files)
 
     # First pass: Identify matched files based on the pattern
     for file in all_files:
-        filename, extension = os.path.splitext(file)
-        match = pattern.match(filename)
-        if match:
+        match = TIMESTAMPED_FILE_PATTERN.match(file)
+        # Without an extension, any dot after the leading ones would start the extension
+        # (and so hide the timestamp), just as with os.path.splitext
+        if match and (match.group(2) is not None or '.' not in match.group(1).lstrip('.')):
             base_name = match.group(1)
             normalized_base_name = normalize_filename(base_name)
             if normalized_base_name not in matched_files:
@@ -65,7 +102,7 @@ def find_matching_files(folder_path):
         if extension.lower() in ['.mp4', '.gif']:
             normalized_base_name = normalize_filename(filename)
             screen_file = f"{filename}-screen.jpg"
-            if screen_file in all_files:
+            if screen_file in all_files_set:
                 if normalized_base_name not in matched_files:
                     matched_files[normalized_base_name] = []
                 if screen_file not in matched_files[normalized_base_name]:
@@ -73,11 +110,44 @@ def find_matching_files(folder_path):
 
     return matched_files
 
+def build_base_file_index(folder_path):
+    """
+    List the files that can serve as a base file, i.e. those without a _dd-dd-dd timestamp
+    and that are not screen files, as (normalized name, listing position, file name) tuples
+    sorted by normalized name so prefix lookups can use bisect.
+    Also returns the full path of every file in the folder, keyed by name.
+    """
+    index = []
+    with os.scandir(folder_path) as entries:
+        paths = {entry.name: entry.path for entry in entries}
+    for position, file in enumerate(paths):
+        filename_no_ext, extension = os.path.splitext(file)
+        if TIMESTAMP_PATTERN.search(filename_no_ext) or '-screen' in file.lower():
+            continue
+        index.append((normalize_filename(filename_no_ext), position, file))
+    index.sort()
+    return index, paths
+
+def find_base_file(base_index, base_keys, normalized_base_name, moved_files):
+    """
+    Return the first file, in directory listing order, whose normalized name starts with
+    normalized_base_name and that has not been moved yet, or None.
+    """
+    best = None
+    i = bisect.bisect_left(base_keys, normalized_base_name)
+    while i < len(base_keys) and base_keys[i].startswith(normalized_base_name):
+        _, position, file = base_index[i]
+        if file not in moved_files and (best is None or position < best[0]):
+            best = (position, file)
+        i += 1
+    return best[1] if best else None
+
 def move_matches_to_folder(folder_path, matched_files, final_destination=None):
     """
     Move matched files and the contents of an existing 'matches' folder to a destination folder.
     If final_destination is provided, files will be moved there;
     otherwise, a folder named <foldername>-review inside folder_path is created and used.
+    Files copied across filesystems keep their contents only, not their modification time.
     """
     # Determine the destination folder
     if final_destination:
@@ -92,30 +162,27 @@ def move_matches_to_folder(folder_path, matched_files, final_destination=None):
     else:
         review_folder = create_review_folder(folder_path)
 
+    # List the candidate base files once instead of rescanning the folder for every group
+    base_index, folder_paths = build_base_file_index(folder_path)
+    base_keys = [normalized for normalized, _, _ in base_index]
+    moved_files = set()
+
     for normalized_base_name, matched_list in matched_files.items():
-        base_file = None
-        # Search for the base file that corresponds to the matched files
-        for file in os.listdir(folder_path):
-            filename_no_ext, extension = os.path.splitext(file)
-            normalized_current_file = normalize_filename(filename_no_ext)
-            # Check if the normalized current file starts with the normalized base name
-            # This allows for extra characters like hashes or suffixes
-            if (normalized_current_file.startswith(normalized_base_name)
-                and not re.search(r'_\d{2}-\d{2}-\d{2}', filename_no_ext)
-                and '-screen' not in file.lower()):  # Skip screen files as the base
-                base_file = file
-                break
+        # Search for the base file that corresponds to the matched files.
+        # A prefix match allows for extra characters like hashes or suffixes.
+        base_file = find_base_file(base_index, base_keys, normalized_base_name, moved_files)
 
         if base_file:
             files_to_move = [base_file] + matched_list
             files_to_move = list(set(files_to_move))  # Remove duplicates
 
             for file_to_move in files_to_move:
-                original_path = os.path.join(folder_path, file_to_move)
+                original_path = folder_paths.get(file_to_move) or os.path.join(folder_path, file_to_move)
                 destination_path = os.path.join(review_folder, file_to_move)
                 if os.path.exists(original_path):
                     try:
-                        shutil.move(original_path, destination_path)
+                        rename_or_move(original_path, destination_path)
+                        moved_files.add(file_to_move)
                         print(f"Moved: '{file_to_move}' to '{review_folder}'")
                     except Exception as e:
                         print(f"Error moving file '{file_to_move}': {e}")
@@ -125,14 +192,14 @@ def move_matches_to_folder(folder_path, matched_files, final_destination=None):
     # Move contents from 'matches' folder if it exists
     matches_folder_path = os.path.join(folder_path, "matches")
     if os.path.exists(matches_folder_path) and os.path.isdir(matches_folder_path):
-        for match_file in os.listdir(matches_folder_path):
-            match_file_path = os.path.join(matches_folder_path, match_file)
-            if os.path.isfile(match_file_path):
-                try:
-                    shutil.move(match_file_path, review_folder)
-                    print(f"Moved from 'matches' folder: '{match_file}' to '{review_folder}'")
-                except Exception as e:
-                    print(f"Error moving file '{match_file}' from 'matches' folder: {e}")
+        with os.scandir(matches_folder_path) as entries:
+            match_entries = [entry for entry in entries if entry.is_file()]
+        for entry in match_entries:
+            try:
+                shutil.move(entry.path, review_folder, copy_function=shutil.copyfile)
+                print(f"Moved from 'matches' folder: '{entry.name}' to '{review_folder}'")
+            except Exception as e:
+                print(f"Error moving file '{entry.name}' from 'matches' folder: {e}")
         try:
             os.rmdir(matches_folder_path)
             print("Removed empty 'matches' folder.")
@@ -141,10 +208,22 @@ def move_matches_to_folder(folder_path, matched_files, final_destination=None):
 
     return review_folder
 
+def name_key(file_name):
+    """
+    Key under which a file name collides with another on case- and normalization-insensitive
+    filesystems (such as the macOS default), so lookups by key never miss an existing file.
+    """
+    return unicodedata.normalize('NFC', file_name).casefold()
+
 def move_input_files(target_directory, input_files):
     """
     Moves the provided input files into the target directory.
+    Files copied across filesystems keep their contents only, not their modification time.
     """
+    # Snapshot the target directory once; only names that may collide still need a stat
+    with os.scandir(target_directory) as entries:
+        existing_keys = {name_key(entry.name) for entry in entries}
+
     for file_path in input_files:
         if not os.path.isfile(file_path):
             print(f"Warning: '{file_path}' is not a valid file and will be skipped.")
@@ -156,11 +235,12 @@ def move_input_files(target_directory, input_files):
             destination_path = os.path.join(target_directory, file_name)
 
             # Check if the file already exists in the target directory
-            if os.path.exists(destination_path):
+            if name_key(file_name) in existing_keys and os.path.exists(destination_path):
                 print(f"Warning: '{file_name}' already exists in '{target_directory}'. Skipping.")
                 continue
 
-            shutil.move(file_path, destination_path)
+            shutil.move(file_path, destination_path, copy_function=shutil.copyfile)
+            existing_keys.add(name_key(file_name))
             print(f"Moved input file '{file_name}' to '{target_directory}'.")
         except Exception as e:
             print(f"Error moving file '{file_path}': {e}")
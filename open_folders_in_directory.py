@@ -7,6 +7,11 @@ import argparse
 
 MAX_TABS = 10  # Maximum number of Finder tabs allowed
 
+# How often, and for how long at most, to check whether Finder has created a new tab.
+# Finder scripting exposes every tab as a Finder window, so the window count rises once it exists.
+TAB_POLL_INTERVAL = 0.02  # Seconds
+TAB_POLL_ATTEMPTS = 100
+
 def get_subfolders_ordered(directory):
     """
     Get subfolders within the given directory up to two levels deep.
@@ -83,11 +88,15 @@ def construct_applescript(main_folder, subfolders, initial=True):
         escaped_subfolder = escape_path(subfolder)
         script += f'''
             try
-                delay 0.6 -- Allow Finder to process the previous command
+                set tabCount to count of Finder windows
                 tell application "System Events"
                     keystroke "t" using {{command down}} -- Open a new tab
                 end tell
-                delay 0.6 -- Allow the new tab to be created
+                -- Wait until the new tab exists instead of sleeping for a fixed time
+                repeat {TAB_POLL_ATTEMPTS} times
+                    if (count of Finder windows) > tabCount then exit repeat
+                    delay {TAB_POLL_INTERVAL}
+                end repeat
                 set target of front Finder window to (POSIX file "{escaped_subfolder}" as alias)
             on error
                 display dialog "Cannot open subfolder: {escaped_subfolder}" buttons {{"OK"}} default button "OK"
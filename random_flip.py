@@ -2,6 +2,7 @@ from PIL import Image
 import sys
 import os
 import random
+from concurrent.futures import ProcessPoolExecutor
 
 def flip_image_horizontally(input_image_path):
     try:
@@ -23,13 +24,19 @@ if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python flip_image.py <input_image_path1> <input_image_path2> ...")
     else:
+        to_flip = []
         for input_image_path in sys.argv[1:]:
             if not os.path.exists(input_image_path):
                 print(f"Error: Input file '{input_image_path}' does not exist.")
             else:
-                # Randomly decide whether to flip the image (50% chance)
+                # Randomly decide whether to flip the image (50% chance). The choice is made here
+                # rather than in the workers, which would share the same forked random state.
                 if random.random() < 0.5:
-                    flip_image_horizontally(input_image_path)
+                    to_flip.append(input_image_path)
                 else:
                     print(f"Skipped flipping '{input_image_path}'")
 
+        # Decode, flip and re-encode the chosen images in parallel
+        if to_flip:
+            with ProcessPoolExecutor(max_workers=min(len(to_flip), os.cpu_count() or 1)) as executor:
+                list(executor.map(flip_image_horizontally, to_flip))
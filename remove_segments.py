@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
 import sys
 import os
+import errno
+import json
+import bisect
 import subprocess
+import tempfile
 import shutil  # New import for moving files
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# How far (in seconds) a keyframe may sit before the start of a kept segment and still be cut
+# without re-encoding. This only absorbs rounding in ffprobe's pts_time; anything larger could
+# reach back a whole frame at high frame rates (one frame is 16.7 ms at 60 fps).
+KEYFRAME_TOLERANCE = 0.001
 
 def parse_time_string(time_str):
     """
@@ -31,37 +41,117 @@ def parse_time_string(time_str):
         except ValueError:
             return None
 
-def has_audio_stream(input_file):
+def probe(input_file):
+    """
+    Return (duration, has_audio) for input_file from a single ffprobe run.
+    duration is None if it cannot be determined.
+    """
     cmd = [
         'ffprobe', '-v', 'error',
-        '-select_streams', 'a',
-        '-show_entries', 'stream=index',
-        '-of', 'csv=p=0', input_file
+        '-show_entries', 'format=duration:stream=codec_type',
+        '-of', 'json',
+        input_file
     ]
     result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-    return (result.returncode == 0 and result.stdout.strip() != '')
+    if result.returncode != 0:
+        return None, False
+    try:
+        data = json.loads(result.stdout)
+    except ValueError:
+        return None, False
+    has_audio = any(s.get('codec_type') == 'audio' for s in data.get('streams', []))
+    try:
+        duration = float(data['format']['duration'])
+    except (KeyError, TypeError, ValueError):
+        duration = None
+    return duration, has_audio
 
-def get_video_duration(input_file):
+def get_keyframe_times(input_file):
+    """
+    Return the sorted presentation times (seconds) of the video keyframes, or None on failure.
+    Only keyframes are decoded, so this is much cheaper than a full decode.
+    """
     cmd = [
         'ffprobe', '-v', 'error',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
+        '-select_streams', 'v:0',
+        '-skip_frame', 'nokey',
+        '-show_entries', 'frame=pts_time',
+        '-of', 'csv=p=0',
         input_file
     ]
     result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
     if result.returncode != 0:
         return None
-    try:
-        return float(result.stdout.strip())
-    except ValueError:
-        return None
+    times = []
+    for line in result.stdout.splitlines():
+        try:
+            times.append(float(line.split(',')[0]))
+        except ValueError:
+            continue
+    return sorted(times)
 
-def remove_segments(input_file, segments):
+def starts_on_keyframes(keep, keyframes):
+    """
+    True if every kept segment starts at the beginning of the file or on a keyframe.
+    Only the starts matter: a stream copy can stop after any frame, but it can only begin on a keyframe.
+    The keyframe must sit at or just before the start; a copy seeking to a point just past a keyframe
+    would begin a whole GOP earlier and bring back removed footage.
+    """
+    for (ks, _) in keep:
+        if ks <= KEYFRAME_TOLERANCE:
+            continue
+        i = bisect.bisect_left(keyframes, ks - KEYFRAME_TOLERANCE)
+        if i == len(keyframes) or keyframes[i] > ks:
+            return False
+    return True
+
+def copy_segments(input_file, keep, out):
+    """
+    Cut each kept segment with a stream copy and join them with the concat demuxer,
+    without decoding or re-encoding anything. Returns True on success, False otherwise.
+    """
+    with tempfile.TemporaryDirectory() as work_dir:
+        parts = []
+        for i, (ks, ke) in enumerate(keep):
+            part = os.path.join(work_dir, f"part{i:05d}{os.path.splitext(out)[1]}")
+            cmd = [
+                "ffmpeg", "-v", "error",
+                "-ss", str(ks),
+                "-i", input_file,
+                "-t", str(ke - ks),
+                "-map", "0:v:0", "-map", "0:a?",
+                "-c", "copy",
+                "-avoid_negative_ts", "make_zero",
+                "-y", part
+            ]
+            print(f"Running: {' '.join(cmd)}")
+            if subprocess.run(cmd).returncode != 0:
+                return False
+            parts.append(part)
+
+        concat_list = os.path.join(work_dir, "parts.txt")
+        with open(concat_list, 'w') as f:
+            for part in parts:
+                escaped_path = part.replace("'", "'\\''")
+                f.write(f"file '{escaped_path}'\n")
+
+        cmd = [
+            "ffmpeg", "-v", "error",
+            "-f", "concat", "-safe", "0",
+            "-i", concat_list,
+            "-c", "copy",
+            "-y", out
+        ]
+        print(f"Running: {' '.join(cmd)}")
+        return subprocess.run(cmd).returncode == 0
+
+def remove_segments(input_file, segments, threads=None):
     """
     segments: list of (start, end) tuples in seconds.
               A value of None means the beginning or end of the file.
+    threads:  number of threads the re-encode may use (ffmpeg picks when None).
     """
-    duration = get_video_duration(input_file)
+    duration, audio_exists = probe(input_file)
     if duration is None:
         print(f"Error: Cannot determine duration of {input_file}")
         return
@@ -102,7 +192,15 @@ def remove_segments(input_file, segments):
         print("All segments removed. Nothing left.")
         return
 
-    audio_exists = has_audio_stream(input_file)
+    base, ext = os.path.splitext(input_file)
+    out = f"{base}_cut{ext}"
+
+    # When every kept segment starts on a keyframe the cut is lossless and needs no encoding at all
+    keyframes = get_keyframe_times(input_file)
+    if keyframes and starts_on_keyframes(keep, keyframes):
+        if copy_segments(input_file, keep, out):
+            return
+        print(f"Stream copy of {input_file} failed; re-encoding instead.")
 
     # Build filter_complex instructions.
     lines = []
@@ -129,8 +227,6 @@ def remove_segments(input_file, segments):
         lines.append(f"{''.join(vlabels)}concat=n={num_segments}:v=1:a=0[outv]")
 
     filter_complex = ";".join(lines)
-    base, ext = os.path.splitext(input_file)
-    out = f"{base}_cut{ext}"
 
     cmd = [
         "ffmpeg",
@@ -142,11 +238,27 @@ def remove_segments(input_file, segments):
         cmd += ["-map", "[outa]", "-c:a", "aac"]
     else:
         cmd += ["-an"]
-    cmd += ["-c:v", "libx264", "-y", out]
+    cmd += ["-c:v", "libx264"]
+    if threads:
+        cmd += ["-threads", str(threads)]
+    cmd += ["-y", out]
 
     print(f"Running: {' '.join(cmd)}")
     subprocess.run(cmd)
 
+def rename_or_move(source, destination):
+    """
+    Move source to destination with a single rename, falling back to shutil.move
+    (copy and delete) only when they are on different filesystems. That copy keeps only
+    the contents: modification time and permissions are not preserved.
+    """
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination, copy_function=shutil.copyfile)
+
 def archive_file(file_path):
     """
     Move the file to an "archive" subfolder within its directory.
@@ -163,7 +275,7 @@ def archive_file(file_path):
             return
     dest = os.path.join(archive_dir, os.path.basename(file_path))
     try:
-        shutil.move(file_path, dest)
+        rename_or_move(file_path, dest)
         print(f"Moved '{file_path}' to '{dest}'")
     except Exception as e:
         print(f"Error moving file {file_path} to archive: {e}")
@@ -219,13 +331,31 @@ def main():
         print("Error: No input files specified.")
         sys.exit(1)
 
+    existing_files = []
     for f in input_files:
         if not os.path.isfile(f):
             print(f"Error: file '{f}' does not exist. Skipped.")
             continue
-        remove_segments(f, segments)
-        # After processing, move the original file to the "archive" subfolder.
-        archive_file(f)
+        existing_files.append(f)
+    if not existing_files:
+        return
+
+    # A single libx264 encode rarely keeps every core busy, so run a few files at once
+    # and split the cores between them
+    cpu_count = os.cpu_count() or 1
+    max_workers = max(1, min(len(existing_files), cpu_count // 4))
+    threads = max(1, cpu_count // max_workers)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(remove_segments, f, segments, threads): f for f in existing_files}
+        for future in as_completed(futures):
+            f = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Error processing {f}: {e}")
+                continue
+            # After processing, move the original file to the "archive" subfolder.
+            archive_file(f)
 
 if __name__ == "__main__":
     main()
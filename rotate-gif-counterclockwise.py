@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 
 import argparse
+import os
+import shutil
+import tempfile
 from PIL import Image, ImageSequence
 import sys
 
@@ -8,21 +11,31 @@ def rotate_gif(input_path, rotation):
     # Open the input GIF
     gif = Image.open(input_path)
     
-    # Rotate each frame
-    frames = []
-    for frame in ImageSequence.Iterator(gif):
-        rotated_frame = frame.rotate(rotation, expand=True)
-        frames.append(rotated_frame)
-    
-    # Save the rotated frames back to the original file
-    frames[0].save(
-        input_path,
-        save_all=True,
-        append_images=frames[1:],
-        duration=gif.info['duration'],
-        loop=gif.info.get('loop', 0),
-        disposal=2
-    )
+    # Rotate each frame lazily, so frames are decoded and rotated only as the encoder asks for them
+    frames = (frame.rotate(rotation, expand=True) for frame in ImageSequence.Iterator(gif))
+    first_frame = next(frames)
+
+    # The input is still being read while the output is written, so write to a temporary
+    # file next to it and replace the original only once the new GIF is complete
+    fd, temp_path = tempfile.mkstemp(suffix='.gif', dir=os.path.dirname(os.path.abspath(input_path)))
+    os.close(fd)
+    try:
+        first_frame.save(
+            temp_path,
+            format='GIF',
+            save_all=True,
+            append_images=frames,
+            duration=gif.info['duration'],
+            loop=gif.info.get('loop', 0),
+            disposal=2
+        )
+        gif.close()
+        shutil.copymode(input_path, temp_path)
+        os.replace(temp_path, input_path)
+    except BaseException:
+        gif.close()
+        os.remove(temp_path)
+        raise
     print(f"Rotated GIF saved and overwritten as {input_path}")
 
 if __name__ == "__main__":
@@ -2,9 +2,22 @@
 
 import sys
 import os
+import errno
 import re
 import shutil
 
+def rename_or_move(source, destination):
+    """
+    Move source to destination with a single rename, falling back to shutil.move
+    (copy and delete) only when they are on different filesystems.
+    """
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination)
+
 def main():
     # Ensure a directory path was provided
     if len(sys.argv) < 2:
@@ -30,17 +43,17 @@ def main():
     # Create the target directory if it doesn't already exist
     os.makedirs(target_dir, exist_ok=True)
 
-    # Iterate over all items in the given directory
-    for item in os.listdir(dir_path):
-        item_path = os.path.join(dir_path, item)
-
-        # Only consider files (ignore subdirectories)
-        if os.path.isfile(item_path):
-            # If filename does not contain the dd-dd-dd pattern, move it
-            if not pattern.search(item):
-                dest_path = os.path.join(target_dir, item)
-                shutil.move(item_path, dest_path)
-                print(f"Moved: {item_path} -> {dest_path}")
+    # Iterate over all items in the given directory; the entries carry their file type,
+    # so no extra stat is needed per item
+    with os.scandir(dir_path) as scan:
+        entries = list(scan)
+
+    for entry in entries:
+        # Only consider files (ignore subdirectories) whose name does not contain the dd-dd-dd pattern
+        if not pattern.search(entry.name) and entry.is_file():
+            dest_path = os.path.join(target_dir, entry.name)
+            rename_or_move(entry.path, dest_path)
+            print(f"Moved: {entry.path} -> {dest_path}")
 
 if __name__ == "__main__":
     main()
@@ -4,6 +4,13 @@ import os
 import sys
 import argparse
 import hashlib
+import mmap
+import json
+import tempfile
+import threading
+from collections import defaultdict, deque
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 # We need send2trash to move files to the macOS Trash (cross-platform).
 # If you don't have it installed, run: pip install send2trash
@@ -13,188 +20,573 @@ except ImportError:
     print("Please install send2trash by running 'pip install send2trash' and try again.")
     sys.exit(1)
 
-def compute_md5(file_path, chunk_size=8192):
-    """Compute MD5 hash of a file in chunks to handle large files efficiently."""
+# BLAKE3 is optional (pip install blake3); it hashes several times faster than MD5.
+# Without it, or with --legacy-hash, file contents are compared by MD5.
+try:
+    import blake3
+except ImportError:
+    blake3 = None
+
+# Number of bytes at the start of each file hashed first. Only files whose first (and last)
+# bytes match another file of the same size are then hashed in full.
+PARTIAL_HASH_BYTES = 64 * 1024
+
+# Number of bytes at the end of each file added to that first hash, so files that only
+# differ near the end (such as trimmed or re-muxed videos) are told apart without a full read.
+TAIL_HASH_BYTES = 4 * 1024
+
+# Number of directories listed at once during a recursive scan. Listing and stat calls
+# mostly wait on the filesystem, which matters most on network shares and large trees.
+SCAN_WORKERS = 8
+
+# Content hashes from earlier runs, keyed by absolute path and reused while a file's size
+# and modification time are unchanged
+HASH_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'separate_same_size_files', 'hashes.json')
+
+def hash_algorithm(legacy_hash=False):
+    """Name of the content hash in use."""
+    return 'blake3' if blake3 is not None and not legacy_hash else 'md5'
+
+def new_hasher(legacy_hash=False):
+    """Return an empty BLAKE3 hasher, or an MD5 one if legacy_hash is set or blake3 is missing."""
+    if blake3 is not None and not legacy_hash:
+        return blake3.blake3()
+    return hashlib.md5()
+
+def compute_partial_hash(file_path, legacy_hash=False, nbytes=PARTIAL_HASH_BYTES):
+    """
+    Compute the content hash (raw digest bytes) of the first nbytes and the last
+    TAIL_HASH_BYTES of a file. Files no longer than nbytes are hashed in full.
+    """
+    file_hash = new_hasher(legacy_hash)
+    try:
+        with open(file_path, 'rb') as f:
+            file_hash.update(f.read(nbytes))
+            size = os.fstat(f.fileno()).st_size
+            if size > nbytes:
+                f.seek(max(nbytes, size - TAIL_HASH_BYTES))
+                file_hash.update(f.read(TAIL_HASH_BYTES))
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+    return file_hash.digest()
+
+def advise_sequential_read(f):
+    """Tell the kernel the whole file will be read in order, so it reads further ahead."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+def advise_sequential_map(mm):
+    """Like advise_sequential_read, for a mapped file: page faults on a mapping ignore posix_fadvise."""
+    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+        try:
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+def advise_done_reading(f):
+    """
+    Let the kernel drop the file's cached pages once it has been hashed, so a long scan
+    does not push everything else out of the page cache.
+    """
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+
+def compute_hash(file_path, legacy_hash=False):
+    """Compute the content hash (raw digest bytes) of a whole file (BLAKE3 when available, otherwise MD5)."""
+    if blake3 is None or legacy_hash:
+        return compute_md5(file_path)
+    file_hash = blake3.blake3()
+    try:
+        with open(file_path, 'rb') as f:
+            try:
+                # Map the file here rather than with update_mmap, so the read-ahead hint
+                # applies to the mapping blake3 actually reads from
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    advise_sequential_map(mm)
+                    file_hash.update(mm)
+            except (ValueError, OSError):
+                # Empty files cannot be mapped, and some filesystems do not support it
+                advise_sequential_read(f)
+                for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                    file_hash.update(chunk)
+            finally:
+                advise_done_reading(f)
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+    return file_hash.digest()
+
+def compute_md5(file_path, chunk_size=1024 * 1024):
+    """Compute the MD5 digest (raw bytes) of a file, handing large buffers straight to hashlib."""
     md5_hash = hashlib.md5()
     try:
         with open(file_path, 'rb') as f:
-            while True:
-                data = f.read(chunk_size)
-                if not data:
-                    break
-                md5_hash.update(data)
+            advise_sequential_read(f)
+            try:
+                if hasattr(hashlib, 'file_digest'):
+                    # Python 3.11+ hashes through one reused buffer without creating a bytes object per chunk
+                    return hashlib.file_digest(f, 'md5').digest()
+                try:
+                    # Let hashlib read the mapped pages directly
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        advise_sequential_map(mm)
+                        md5_hash.update(mm)
+                except (ValueError, OSError):
+                    # Empty files cannot be mapped, and some filesystems do not support it.
+                    # Read into one reused buffer instead: 1 MiB chunks keep the number of Python-level
+                    # iterations (and calls into OpenSSL) low, while staying small enough to be cache friendly.
+                    buffer = bytearray(chunk_size)
+                    view = memoryview(buffer)
+                    while True:
+                        n = f.readinto(buffer)
+                        if not n:
+                            break
+                        md5_hash.update(view[:n])
+            finally:
+                advise_done_reading(f)
     except Exception as e:
         print(f"Error reading {file_path}: {e}")
-    return md5_hash.hexdigest()
+    return md5_hash.digest()
+
+def load_hash_cache(cache_path=HASH_CACHE_PATH):
+    """Load the hash cache, or return an empty one if it is missing or unreadable."""
+    try:
+        with open(cache_path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+def save_hash_cache(hash_cache, cache_path=HASH_CACHE_PATH):
+    """Write the hash cache, replacing the previous file only once the new one is complete."""
+    try:
+        cache_dir = os.path.dirname(cache_path)
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.json', dir=cache_dir)
+        with os.fdopen(fd, 'w') as f:
+            json.dump(hash_cache, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"Could not save hash cache {cache_path}: {e}")
+
+def cached_hash(hash_cache, kind, file_path, compute, legacy_hash):
+    """
+    Return compute(file_path, legacy_hash), reusing the hash stored under kind in hash_cache
+    if the file's size and modification time have not changed since it was stored.
+    """
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return compute(file_path, legacy_hash)
+    key = os.path.abspath(file_path)
+    entry = hash_cache.get(key)
+    if not isinstance(entry, dict) or entry.get('size') != st.st_size or entry.get('mtime_ns') != st.st_mtime_ns:
+        entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        hash_cache[key] = entry
+    elif kind in entry:
+        # Digests are stored as hex, since JSON has no bytes type
+        try:
+            return bytes.fromhex(entry[kind])
+        except (TypeError, ValueError):
+            pass
+    file_hash = compute(file_path, legacy_hash)
+    # An unreadable file gets the hash of whatever could be read, which must not be reused later
+    if os.access(file_path, os.R_OK):
+        entry[kind] = file_hash.hex()
+    return file_hash
+
+def file_size(entry):
+    """
+    Return the size of a directory entry that is a file, or None for anything else.
+    Entries already know their type, so only the size needs a stat call.
+    """
+    try:
+        if not entry.is_file():
+            return None
+    except OSError:
+        return None
+    try:
+        return entry.stat().st_size
+    except Exception as e:
+        print(f"Could not get size for {entry.path}: {e}")
+        return None
+
+def scan_directory(path):
+    """
+    List one directory, returning its files as (path, name, size) tuples and its subdirectories.
+    Like os.walk, unreadable directories are skipped and symlinked directories are not followed.
+    """
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return [], []
+    files = []
+    subdirs = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            if not entry.is_symlink():
+                subdirs.append(entry.path)
+        else:
+            size = file_size(entry)
+            if size is not None:
+                files.append((entry.path, entry.name, size))
+    return files, subdirs
+
+def walk_files(directory, workers=SCAN_WORKERS):
+    """
+    Return (path, name, size) for every file under directory, in the same order as os.walk.
+    Subdirectories are listed and stat'ed concurrently as soon as they are discovered,
+    then the results are put back into walk order.
+    """
+    listings = {}  # { directory path: (files, subdirs) }
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {executor.submit(scan_directory, directory): directory}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                listings[path] = future.result()
+                for subdir in listings[path][1]:
+                    pending[executor.submit(scan_directory, subdir)] = subdir
+
+    files = []
+    stack = [directory]
+    while stack:
+        files_here, subdirs = listings[stack.pop()]
+        files.extend(files_here)
+        stack.extend(reversed(subdirs))
+    return files
 
-def find_duplicates_by_size_and_hash(directory, recursive=False):
+def group_duplicates(same_size, content_hashes):
+    """
+    Split one size group, given as (path, name) pairs, into its duplicate sets using the
+    files' content hashes. Returns the sets with more than one file, in scan order.
+    """
+    paths = [path for path, _ in same_size]
+
+    # For each file, record its content hash and basename.
+    file_info = []  # Each element is a tuple: (content_hash, basename)
+    for path, base_name in same_size:
+        file_info.append((content_hashes[path], base_name))
+    
+    # Use union-find to group files if they share the same content hash or the same basename.
+    n = len(paths)
+    parent = list(range(n))
+    rank = [0] * n
+    
+    def find(x):
+        # Iterative path halving: no recursion, and each lookup shortens the path
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+    
+    def union(x, y):
+        rx = find(x)
+        ry = find(y)
+        if rx == ry:
+            return
+        # Union by rank keeps the trees shallow
+        if rank[rx] < rank[ry]:
+            rx, ry = ry, rx
+        parent[ry] = rx
+        if rank[rx] == rank[ry]:
+            rank[rx] += 1
+    
+    # Bucket the files by content hash and by name; files sharing either are merged.
+    by_hash = {}
+    by_name = {}
+    for i, (file_hash, base_name) in enumerate(file_info):
+        by_hash.setdefault(file_hash, []).append(i)
+        by_name.setdefault(base_name, []).append(i)
+    for bucket in list(by_hash.values()) + list(by_name.values()):
+        for k in bucket[1:]:
+            union(bucket[0], k)
+    
+    # Group files by their representative parent.
+    groups = {}
+    for i in range(n):
+        root = find(i)
+        groups.setdefault(root, []).append(paths[i])
+    
+    # Only consider groups with more than one file as duplicates.
+    return [group for group in groups.values() if len(group) > 1]
+
+def resolve_size_group(same_size, content_futures):
+    """Yield the duplicate sets of one size group once its content hashes are available."""
+    if content_futures is None:
+        # Every file has the same name, so the whole size group is one set
+        yield [path for path, _ in same_size]
+        return
+    content_hashes = {path: future.result() for path, future in content_futures.items()}
+    yield from group_duplicates(same_size, content_hashes)
+
+def find_duplicates_by_size_and_hash(directory, recursive=False, legacy_hash=False, jobs=None, hash_cache=None,
+                                     min_size=0):
     """
     Scans the directory for duplicate files.
     
     Files are first grouped by file size. Then, within each size group,
     files are considered duplicates if they have either:
-      - the same MD5 hash (i.e. identical content), or 
+      - the same content hash (BLAKE3, or MD5 if legacy_hash is set), or 
       - the same file name (basename)
     
-    If a duplicate group is found (i.e. more than one file in a group),
-    it will be returned as a list of lists.
+    Each duplicate group found (i.e. more than one file in a group) is yielded as a list
+    of absolute paths, as soon as its size group has been hashed.
     
     If recursive=False, only the top-level of the directory is scanned.
     If recursive=True, all subdirectories are scanned.
+    If legacy_hash=True, contents are compared by MD5 even when blake3 is installed.
+    jobs is the number of files hashed at once (default: twice the CPU count).
+    If hash_cache is given (see load_hash_cache), hashes of unchanged files are taken from it
+    and new ones are added to it; entries for files under directory that no longer exist are dropped.
+    Files smaller than min_size bytes are ignored.
     """
-    size_dict = {}  # { file_size: [file_path1, file_path2, ...] }
+    size_dict = defaultdict(list)  # { file_size: [(file_path1, name1), (file_path2, name2), ...] }
     file_count = 0
 
+    # Scan from the absolute path, so every path found is already absolute and normalized
+    # and later steps (depth, keep-directory checks, cache keys) need no os.path.abspath calls
+    directory = os.path.abspath(directory)
+
     print(f"Scanning directory: {directory}")
     if recursive:
-        for root, dirs, files in os.walk(directory):
-            for filename in files:
-                file_path = os.path.join(root, filename)
-                if os.path.isfile(file_path):
-                    try:
-                        file_size = os.path.getsize(file_path)
-                    except Exception as e:
-                        print(f"Could not get size for {file_path}: {e}")
-                        continue
-                    size_dict.setdefault(file_size, []).append(file_path)
-                    file_count += 1
+        files = walk_files(directory)
     else:
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            if os.path.isfile(file_path):
-                try:
-                    file_size = os.path.getsize(file_path)
-                except Exception as e:
-                    print(f"Could not get size for {file_path}: {e}")
-                    continue
-                size_dict.setdefault(file_size, []).append(file_path)
-                file_count += 1
+        files = []
+        with os.scandir(directory) as it:
+            for entry in it:
+                size_val = file_size(entry)
+                if size_val is not None:
+                    files.append((entry.path, entry.name, size_val))
+
+    # Keep the names the directory listing already gave, so no basename calls are needed later
+    for file_path, file_name, size_val in files:
+        if size_val < min_size:
+            continue
+        size_dict[size_val].append((file_path, file_name))
+        file_count += 1
 
     if file_count == 0:
         print("No files found in the directory.")
-        return []
+        return
 
     print(f"Finished scanning. {file_count} file(s) found. Processing potential duplicates...\n")
     
-    duplicate_groups = []
-    # Process each size group separately.
-    for size_val, paths in size_dict.items():
-        if len(paths) < 2:
-            continue  # Skip groups with only one file
-        
-        # For each file, compute its MD5 hash and basename.
-        file_info = []  # Each element is a tuple: (md5, basename)
-        for path in paths:
-            file_hash = compute_md5(path)
-            base_name = os.path.basename(path)
-            file_info.append((file_hash, base_name))
-        
-        # Use union-find to group files if they share the same MD5 or the same basename.
-        n = len(paths)
-        parent = list(range(n))
-        
-        def find(x):
-            if parent[x] != x:
-                parent[x] = find(parent[x])
-            return parent[x]
-        
-        def union(x, y):
-            rx = find(x)
-            ry = find(y)
-            if rx != ry:
-                parent[ry] = rx
-        
-        # Compare each pair in the group.
-        for i in range(n):
-            for j in range(i + 1, n):
-                # If files share the same content (md5) OR same name, merge them.
-                if file_info[i][0] == file_info[j][0] or file_info[i][1] == file_info[j][1]:
-                    union(i, j)
-        
-        # Group files by their representative parent.
-        groups = {}
-        for i in range(n):
-            root = find(i)
-            groups.setdefault(root, []).append(paths[i])
-        
-        # Only consider groups with more than one file as duplicates.
-        for group in groups.values():
-            if len(group) > 1:
-                duplicate_groups.append(group)
-
-    return duplicate_groups
-
-def is_in_directory(file_path, directory):
-    """
-    Check if file_path is within the given directory (or its subdirectories).
-    Both paths are normalized to absolute paths for comparison.
-    """
-    file_path = os.path.abspath(file_path)
-    directory = os.path.abspath(directory)
-    # Ensure the directory path ends with a separator for correct matching.
-    directory_with_sep = os.path.join(directory, '')
-    return file_path.startswith(directory_with_sep)
+    # Only sizes shared by two or more files can hold duplicates
+    candidate_groups = {size_val: same_size for size_val, same_size in size_dict.items() if len(same_size) >= 2}
+
+    # Files sharing a name are duplicates whatever their content, so a size group in which every
+    # file has the same name is one duplicate set without reading any file. (If the names differ,
+    # every file still needs its hash: any of them may match a file in another name group.)
+    single_name_sizes = {size_val for size_val, same_size in candidate_groups.items()
+                         if len({name for _, name in same_size}) == 1}
+    candidates = [path for size_val, same_size in candidate_groups.items() if size_val not in single_name_sizes
+                  for path, _ in same_size]
+
+    algorithm = hash_algorithm(legacy_hash)
+
+    def partial_hash_of(path):
+        if hash_cache is None:
+            return compute_partial_hash(path, legacy_hash)
+        kind = f"{algorithm}-partial-{PARTIAL_HASH_BYTES}-{TAIL_HASH_BYTES}"
+        return cached_hash(hash_cache, kind, path, compute_partial_hash, legacy_hash)
+
+    def full_hash_of(path):
+        if hash_cache is None:
+            return compute_hash(path, legacy_hash)
+        return cached_hash(hash_cache, f"{algorithm}-full", path, compute_hash, legacy_hash)
 
-def handle_duplicates(duplicate_groups, keep_directory=None):
+    # Hashing mostly waits on the disk and hashlib releases the GIL while hashing,
+    # so files from every size group are hashed on a shared thread pool.
+    if jobs is None:
+        jobs = (os.cpu_count() or 1) * 2
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        try:
+            # Hash the start and end of each file first; files whose start or end differs from every
+            # other file of their size cannot share its content, so they are never read in full.
+            # Files no longer than the partial read are already hashed in full.
+            partial_futures = {path: executor.submit(partial_hash_of, path) for path in candidates}
+
+            # Size groups are finished in scan order, and each one is yielded as soon as its hashes
+            # are in, so the caller can act on it while later groups are still being hashed.
+            pending = deque()  # (same_size, { file_path: future of its content hash } or None)
+            for size_val, same_size in candidate_groups.items():
+                if size_val in single_name_sizes:
+                    pending.append((same_size, None))
+                else:
+                    content_futures = {path: partial_futures[path] for path, _ in same_size}
+                    if size_val > PARTIAL_HASH_BYTES:
+                        partial_groups = {}  # { partial_hash: [file_path1, file_path2, ...] }
+                        for path, _ in same_size:
+                            partial_groups.setdefault(partial_futures[path].result(), []).append(path)
+                        for same_start in partial_groups.values():
+                            if len(same_start) >= 2:
+                                for path in same_start:
+                                    content_futures[path] = executor.submit(full_hash_of, path)
+                    pending.append((same_size, content_futures))
+
+                while pending and (pending[0][1] is None or all(f.done() for f in pending[0][1].values())):
+                    yield from resolve_size_group(*pending.popleft())
+            while pending:
+                yield from resolve_size_group(*pending.popleft())
+        except BaseException:
+            # On Ctrl-C (or if the caller stops early) drop the queued hashes instead of waiting for them
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    if hash_cache is not None:
+        # Forget files under the scanned directory that are gone
+        scanned = {path for path, _, _ in files}
+        prefix = os.path.join(directory, '')
+        for key in [key for key in hash_cache if key.startswith(prefix) and key not in scanned]:
+            if recursive or os.path.dirname(key) == os.path.dirname(prefix):
+                del hash_cache[key]
+
+def trash_files(paths, log=print):
+    """
+    Send files to Trash in a single batched send2trash call,
+    falling back to one call per file if the batch fails.
+    Each outcome is reported through log, one line at a time.
+    Returns the number of files trashed.
     """
-    For each set of duplicate files:
+    if not paths:
+        return 0
+    try:
+        send2trash(paths)
+        for fp in paths:
+            log(f"  Trashed: {fp}")
+        return len(paths)
+    except Exception as e:
+        log(f"Error sending files to Trash in one batch ({e}); retrying one at a time.")
+    total_trashed = 0
+    for fp in paths:
+        if not os.path.lexists(fp):
+            # The failed batch already moved this one before it stopped
+            log(f"  Trashed: {fp}")
+            total_trashed += 1
+            continue
+        try:
+            send2trash(fp)
+            log(f"  Trashed: {fp}")
+            total_trashed += 1
+        except Exception as e:
+            log(f"  Failed to trash {fp}: {e}")
+    return total_trashed
+
+def handle_duplicates(duplicate_groups, keep_prefix=None, dry_run=False):
+    """
+    For each set of duplicate files (absolute paths, as yielded by find_duplicates_by_size_and_hash):
       - Print the group.
       - Determine which file(s) to keep:
            * If --keep-directory is specified and one or more files are in that directory,
-             those files are preserved and duplicates outside are trashed.
+             those files are preserved and duplicates outside are trashed. keep_prefix is the
+             absolute keep-directory path ending with a separator, so membership is a prefix check.
            * Otherwise, keep the file that is deeper in the directory hierarchy.
-      - Move the files to be removed to Trash.
-    Returns the total number of files trashed.
+      - Move the files to be removed to Trash. This runs on a background thread while the next
+        sets are still being found, and every file decided on while the previous send2trash call
+        was running goes into the next call as one batch (on macOS each call goes through Finder,
+        so a few large calls are much faster than many small ones). Each set's files are listed
+        as soon as they are decided on, and the background thread's results are printed from
+        this thread once all sets are done, so they never land under a later set.
+    If dry_run is True, nothing is trashed and the files that would be are listed instead.
+    Returns the total number of files trashed (or that would be trashed).
     """
     total_trashed = 0
+    pending_trash = []  # Files decided on but not yet handed to send2trash
+    pending_lock = threading.Lock()
+    trash_log = []  # Lines reported by the background thread, printed once it is done
 
-    def get_depth(fp):
-        # Count the number of os.sep in the absolute path as a measure of depth.
-        return os.path.abspath(fp).count(os.sep)
+    def trash_pending():
+        with pending_lock:
+            batch = pending_trash[:]
+            pending_trash.clear()
+        return trash_files(batch, log=trash_log.append)
 
-    for group in duplicate_groups:
-        print("\nFound duplicate set:")
-        for file_path in group:
-            print(f"  - {file_path}")
+    def get_depth(fp):
+        # Count the number of os.sep in the (already absolute) path as a measure of depth.
+        return fp.count(os.sep)
 
-        files_to_trash = []
-        if keep_directory:
+    def choose_files_to_trash(group):
+        if keep_prefix:
             # Partition the group: files inside the keep-directory vs. others.
-            immune = [f for f in group if is_in_directory(f, keep_directory)]
-            candidates = [f for f in group if f not in immune]
+            immune = []
+            candidates = []
+            for f in group:
+                if f.startswith(keep_prefix):
+                    immune.append(f)
+                else:
+                    candidates.append(f)
             if immune:
                 print("  Retaining file(s) in the keep-directory; files outside will be trashed.")
-                files_to_trash = candidates
-            else:
-                # No file is in the keep-directory; choose the deepest file.
-                keep_file = max(group, key=get_depth)
-                print(f"  Retaining the deepest file: {keep_file}")
-                files_to_trash = [f for f in group if f != keep_file]
-        else:
-            # No keep-directory specified; choose the deepest file.
+                return candidates
+            # No file is in the keep-directory; choose the deepest file.
             keep_file = max(group, key=get_depth)
             print(f"  Retaining the deepest file: {keep_file}")
-            files_to_trash = [f for f in group if f != keep_file]
+            return [f for f in group if f != keep_file]
+        # No keep-directory specified; choose the deepest file.
+        keep_file = max(group, key=get_depth)
+        print(f"  Retaining the deepest file: {keep_file}")
+        return [f for f in group if f != keep_file]
 
-        for fp in files_to_trash:
+    trash_jobs = []
+    try:
+        with ThreadPoolExecutor(max_workers=1) as trasher:
             try:
-                send2trash(fp)
-                print(f"  Trashed: {fp}")
-                total_trashed += 1
-            except Exception as e:
-                print(f"  Failed to trash {fp}: {e}")
+                for group in duplicate_groups:
+                    print("\nFound duplicate set:")
+                    for file_path in group:
+                        print(f"  - {file_path}")
+
+                    files_to_trash = choose_files_to_trash(group)
+                    if dry_run:
+                        for fp in files_to_trash:
+                            print(f"  Would trash: {fp}")
+                        total_trashed += len(files_to_trash)
+                    elif files_to_trash:
+                        for fp in files_to_trash:
+                            print(f"  To trash: {fp}")
+                        with pending_lock:
+                            pending_trash.extend(files_to_trash)
+                        trash_jobs.append(trasher.submit(trash_pending))
 
+                total_trashed += sum(job.result() for job in trash_jobs)
+            except BaseException:
+                # After Ctrl-C nothing more is trashed; only a batch already handed to send2trash finishes
+                trasher.shutdown(wait=False, cancel_futures=True)
+                raise
+    finally:
+        # Leaving the with block waits for that batch, so this log is complete even after Ctrl-C
+        if trash_log:
+            print("\nTrash results:")
+            for line in trash_log:
+                print(line)
     return total_trashed
 
 def main():
     parser = argparse.ArgumentParser(
         description="Find duplicate files in a directory and remove duplicates based on file size, content, or name.\n\n"
-                    "Duplicates are detected if files share the same size and either have identical content (MD5) "
+                    "Duplicates are detected if files share the same size and either have identical content (BLAKE3 or MD5) "
                     "or the same file name.\n\n"
                     "Flags:\n"
                     "  --recursive           Scan subdirectories recursively.\n"
                     "  --keep-directory DIR  Preserve all files within DIR (and its subdirectories).\n"
-                    "                        If specified, recursive scanning is automatically enabled.\n",
+                    "                        If specified, recursive scanning is automatically enabled.\n"
+                    "  --legacy-hash         Compare contents by MD5 even when blake3 is installed.\n"
+                    "  --jobs N              Number of files hashed at once (default: twice the CPU count).\n"
+                    "  --no-hash-cache       Hash every file again instead of reusing hashes from earlier runs.\n"
+                    "  --min-size BYTES      Ignore files smaller than BYTES (default: 0, i.e. consider every file).\n"
+                    "  --dry-run             List the files that would be trashed without trashing them.\n",
         formatter_class=argparse.RawTextHelpFormatter
     )
     parser.add_argument("directory", help="Directory to scan for duplicates")
@@ -209,6 +601,32 @@ def main():
         help="Directory (and its subdirectories) that should be preserved (untouched).\n"
              "If specified, files within this directory will not be trashed, and --recursive is enabled by default."
     )
+    parser.add_argument(
+        "--legacy-hash",
+        action="store_true",
+        help="Compare file contents by MD5 instead of BLAKE3 (MD5 is also used when blake3 is not installed)"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        help="Number of files hashed at once (default: twice the CPU count)"
+    )
+    parser.add_argument(
+        "--no-hash-cache",
+        action="store_true",
+        help=f"Do not read or update the hash cache ({HASH_CACHE_PATH})"
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=0,
+        help="Ignore files smaller than this many bytes, e.g. 4096 to skip small OS and metadata files (default: 0)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="List the files that would be trashed without trashing them"
+    )
     
     # If no arguments are provided, show help.
     if len(sys.argv) == 1:
@@ -223,11 +641,14 @@ def main():
         sys.exit(1)
 
     keep_directory = None
+    keep_prefix = None
     if args.keep_directory:
         if not os.path.isdir(args.keep_directory):
             print(f"Error: '--keep-directory' value '{args.keep_directory}' is not a valid directory.")
             sys.exit(1)
         keep_directory = os.path.abspath(args.keep_directory)
+        # Ends with a separator so that e.g. /foo/bar does not match /foo/barbaz
+        keep_prefix = os.path.join(keep_directory, '')
         # When a keep-directory is specified, we enable recursive scanning.
         args.recursive = True
         print(f"Keep-directory set to: {keep_directory}")
@@ -238,14 +659,24 @@ def main():
         print("Recursive scanning is disabled. (Scanning only the top-level directory)")
 
     print("\nStarting duplicate file scan...\n")
-    duplicate_groups = find_duplicates_by_size_and_hash(directory, recursive=args.recursive)
-
-    if not duplicate_groups:
+    hash_cache = None if args.no_hash_cache else load_hash_cache()
+    # Duplicate sets are handled as they are found, so trashing overlaps with hashing
+    duplicate_groups = find_duplicates_by_size_and_hash(directory, recursive=args.recursive, legacy_hash=args.legacy_hash,
+                                                        jobs=args.jobs, hash_cache=hash_cache, min_size=args.min_size)
+    first_group = next(duplicate_groups, None)
+    if first_group is None:
+        if hash_cache is not None:
+            save_hash_cache(hash_cache)
         print("No duplicate files found.")
         sys.exit(0)
 
-    trashed_count = handle_duplicates(duplicate_groups, keep_directory=keep_directory)
-    print(f"\nDone. Processed duplicate sets and trashed {trashed_count} file(s).")
+    trashed_count = handle_duplicates(chain([first_group], duplicate_groups), keep_prefix=keep_prefix, dry_run=args.dry_run)
+    if hash_cache is not None:
+        save_hash_cache(hash_cache)
+    if args.dry_run:
+        print(f"\nDone. Processed duplicate sets; {trashed_count} file(s) would be trashed.")
+    else:
+        print(f"\nDone. Processed duplicate sets and trashed {trashed_count} file(s).")
 
 if __name__ == "__main__":
     main()